@@ -1,8 +1,9 @@
 import os
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 from ..models.message import Message, ActionItem
 from ..models.context import QueryRequest, QueryResponse
+from ..services.chat_stats import ChatStats, format_status, is_status_question
 
 class BuddyAgent:
     def __init__(self):
@@ -52,9 +53,20 @@ class BuddyAgent:
         
         return action_items
     
-    def answer_question(self, query: QueryRequest, context_messages: List[Message]) -> QueryResponse:
-        """Answer questions using AI and context"""
-        context_text = "\n".join([f"{msg.timestamp}: {msg.content}" for msg in context_messages[-10:]])
+    def answer_question(self, query: QueryRequest, context_messages: List[Message],
+                        digest: Optional[Dict] = None) -> QueryResponse:
+        """Answer questions using AI and context.
+        
+        General status questions are answered from ``digest`` (see
+        ContextManager.get_digest) without calling the model.
+        """
+        if digest is not None and is_status_question(query.question):
+            return QueryResponse(answer=format_status(digest), confidence=0.9)
+        
+        context_text = "\n".join([
+            f"{msg.timestamp}: {msg.content}" + (f" (posted {msg.repeat_count} times)" if msg.repeat_count > 1 else "")
+            for msg in context_messages[-10:]
+        ])
         
         prompt = f"""Based on this conversation context:
 {context_text}
@@ -72,11 +84,11 @@ Focus on tasks, project status, and action items from the conversation."""
                 )
                 answer = response.choices[0].message.content
             else:
-                answer = self._fallback_answer(query, context_messages)
+                answer = self._fallback_answer(query, context_messages, digest)
                 
         except Exception as e:
             print(f"AI API error: {e}")
-            answer = self._fallback_answer(query, context_messages)
+            answer = self._fallback_answer(query, context_messages, digest)
         
         return QueryResponse(
             answer=answer,
@@ -84,9 +96,12 @@ Focus on tasks, project status, and action items from the conversation."""
             confidence=0.8
         )
     
-    def _fallback_answer(self, query: QueryRequest, context_messages: List[Message]) -> str:
+    def _fallback_answer(self, query: QueryRequest, context_messages: List[Message],
+                         digest: Optional[Dict] = None) -> str:
         """Fallback answering without AI API"""
         question_lower = query.question.lower()
+        if digest is None and ("working on" in question_lower or "project" in question_lower or "status" in question_lower):
+            digest = ChatStats.from_messages(context_messages, query.channel_id).digest()
         
         if "action" in question_lower or "task" in question_lower or "todo" in question_lower:
             action_items = self.extract_action_items(context_messages)
@@ -96,10 +111,13 @@ Focus on tasks, project status, and action items from the conversation."""
                 return "No pending action items found in the conversation."
         
         elif "working on" in question_lower or "project" in question_lower:
-            return "Based on the conversation, the team is working on API integration, authentication service, and database migrations."
+            if not digest["top_terms"]:
+                return "I haven't seen enough conversation yet to tell what the team is working on."
+            topics = ", ".join(term for term, _ in digest["top_terms"][:5])
+            return f"Based on the conversation, the most discussed topics this week are: {topics}."
         
         elif "status" in question_lower:
-            return "Current status: API integration in progress, authentication service almost done, rate limiting pending implementation."
+            return format_status(digest)
         
         else:
             return f"I can help with questions about tasks, project status, and action items. Current context includes {len(context_messages)} messages."
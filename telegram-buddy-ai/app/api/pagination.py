@@ -0,0 +1,60 @@
+# app/api/pagination.py
+"""Cursor pagination and conditional-request helpers for the API routes"""
+import time
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple, TypeVar
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# Versions restart from 0 with the process; tags from before a restart must not match
+_PROCESS_NONCE = format(time.time_ns(), "x")
+
+
+def paginate(items: List[Tuple[int, T]], limit: int, cursor: Optional[int] = None,
+             since: Optional[int] = None) -> Tuple[List[Tuple[int, T]], Optional[int], bool]:
+    """Page through ``(key, item)`` pairs sorted by increasing key.
+    
+    - ``since``: the oldest ``limit`` items with key > since; ``has_more`` tells
+      the client to ask again with the last key it got
+    - ``cursor``: the newest ``limit`` items with key < cursor (older page)
+    - neither: the newest ``limit`` items
+    
+    Returns ``(page, next_cursor, has_more)``.
+    """
+    keys = [key for key, _ in items]
+    
+    if since is not None:
+        start = bisect_right(keys, since)
+        page = items[start:start + limit]
+        return page, None, start + limit < len(items)
+    
+    end = len(items) if cursor is None else bisect_left(keys, cursor)
+    start = max(0, end - limit)
+    page = items[start:end]
+    next_cursor = page[0][0] if page and start > 0 else None
+    return page, next_cursor, False
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag from ``parts``, which must include every input that shapes the body"""
+    return 'W/"' + "-".join(str(part) for part in (_PROCESS_NONCE, *parts)) + '"'
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response if the client already has this version"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [tag.strip() for tag in if_none_match.split(",")]):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    return None
+
+
+def json_response(model: BaseModel, etag: str) -> Response:
+    """Serialize with pydantic-core's JSON encoder (no intermediate dicts)"""
+    return Response(
+        content=model.model_dump_json(),
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
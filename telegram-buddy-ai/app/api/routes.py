@@ -1,16 +1,22 @@
-from fastapi import APIRouter, HTTPException, Form
-from typing import List
+from fastapi import APIRouter, HTTPException, Form, Query, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional
 from datetime import datetime
+import codecs
 import uuid
 
 from ..models.message import Message, ActionItem
-from ..models.context import QueryRequest, QueryResponse, ConversationContext
+from ..models.context import QueryRequest, QueryResponse, ContextPage, ActionPage
 from ..agents.buddy_agent import BuddyAgent
 from ..services.context_manager import ContextManager
+from ..services.event_bus import EventBus
+from ..services.history_import import FORMATS, HistoryImporter, HistoryImportError
+from .pagination import paginate, make_etag, not_modified, json_response
 
 router = APIRouter()
 buddy_agent = None
-context_manager = ContextManager()
+event_bus = EventBus()
+context_manager = ContextManager(event_bus=event_bus)
 
 def get_buddy_agent():
     global buddy_agent
@@ -24,38 +30,153 @@ async def submit_message(content: str = Form(), project_id: str = Form(default="
     message = Message(
         content=content,
         timestamp=datetime.now(),
+        channel_id=project_id,
         message_id=str(uuid.uuid4())
     )
     
-    # Add to context
-    context_manager.add_message(message, project_id)
-    
-    # Extract action items
-    action_items = get_buddy_agent().extract_action_items([message])
-    if action_items:
-        context_manager.add_action_items(action_items, project_id)
+    # Add to context (detects action items as well)
+    action_item = context_manager.add_message(message)
     
     return {
         "message_id": message.message_id,
         "processed": True,
-        "action_items_found": len(action_items)
+        "action_items_found": 1 if action_item else 0
     }
 
-@router.get("/context/{project_id}")
-async def get_context(project_id: str) -> ConversationContext:
-    """Get conversation context for project"""
-    return context_manager.get_context(project_id)
+@router.post("/import")
+async def import_history(request: Request, format: str = "json", project_id: Optional[str] = None):
+    """Bulk import chat history streamed in the request body.
+    
+    Accepts a Telegram Desktop export (result.json) or NDJSON. Without
+    project_id, messages go to the channels named in the export.
+    """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {FORMATS}")
+    
+    importer = HistoryImporter(context_manager, format, project_id)
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        async for chunk in request.stream():
+            importer.feed(decoder.decode(chunk))
+        importer.feed(decoder.decode(b"", final=True))
+        return importer.finish()
+    except (HistoryImportError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Import failed after {importer.messages} messages: {e}")
+
+@router.get("/context/{project_id}", response_model=ContextPage)
+async def get_context(
+    project_id: str,
+    request: Request,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[int] = Query(default=None, description="return messages older than this sequence number"),
+    since: Optional[int] = Query(default=None, description="return only messages newer than this sequence number")
+) -> Response:
+    """Get a page of conversation context for project.
+    
+    Supports If-None-Match: unchanged contexts answer 304 without a body.
+    """
+    etag = make_etag(project_id, context_manager.get_version(project_id), limit, cursor, since)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    messages = context_manager.get_sequenced_messages(project_id)
+    page, next_cursor, has_more = paginate(messages, limit, cursor, since)
+    return json_response(ContextPage(
+        project_id=project_id,
+        messages=[message for _, message in page],
+        first_seq=page[0][0] if page else None,
+        latest_seq=messages[-1][0] if messages else 0,
+        total_messages=len(messages),
+        next_cursor=next_cursor,
+        has_more=has_more,
+        last_updated=context_manager.last_updated.get(project_id) or datetime.now()
+    ), etag)
+
+@router.get("/actions/{project_id}", response_model=ActionPage)
+async def get_actions(
+    project_id: str,
+    request: Request,
+    status: str = Query(default="unresolved", pattern="^(unresolved|resolved|all)$"),
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: Optional[int] = Query(default=None, description="return actions older than this action_id"),
+    since: Optional[int] = Query(default=None, description="return only actions newer than this action_id")
+) -> Response:
+    """Get a page of action items for project (unresolved by default)"""
+    etag = make_etag(project_id, context_manager.get_version(project_id), status, limit, cursor, since)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    items = [
+        (item.action_id, item) for item in context_manager.action_items.get(project_id, [])
+        if status == "all" or item.status == status
+    ]
+    page, next_cursor, has_more = paginate(items, limit, cursor, since)
+    
+    return json_response(ActionPage(
+        project_id=project_id,
+        action_items=[
+            ActionItem(
+                description=item.description,
+                mentioned_at=item.mentioned_at,
+                assigned_to=item.assigned_to,
+                status=item.status,
+                project_id=project_id,
+                action_id=item.action_id
+            )
+            for _, item in page
+        ],
+        latest_id=context_manager.action_totals.get(project_id, 0),
+        total=len(items),
+        next_cursor=next_cursor,
+        has_more=has_more
+    ), etag)
+
+@router.get("/digest/{project_id}")
+async def get_digest(project_id: str, request: Request) -> Response:
+    """Precomputed activity digest: messages per hour, most active users,
+    top terms and open/resolved action counts
+    """
+    digest = context_manager.get_digest(project_id)
+    etag = make_etag(project_id, context_manager.get_version(project_id), digest["generated_at"][:13])
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return JSONResponse(digest, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+@router.post("/actions/{project_id}/{action_id}/resolve")
+async def resolve_action(project_id: str, action_id: int):
+    """Mark an action item as resolved"""
+    for index, item in enumerate(context_manager.action_items.get(project_id, [])):
+        if item.action_id == action_id:
+            context_manager.mark_action_resolved(project_id, index)
+            return {"action_id": action_id, "status": item.status}
+    raise HTTPException(status_code=404, detail=f"Action item {action_id} not found")
 
-@router.get("/actions/{project_id}")
-async def get_actions(project_id: str) -> List[ActionItem]:
-    """Get unresolved action items for project"""
-    return context_manager.get_unresolved_actions(project_id)
+@router.get("/events/{project_id}")
+async def stream_events(project_id: str):
+    """Server-Sent Events stream of message_added, messages_imported,
+    action_detected and action_resolved events for a project.
+    """
+    subscription = event_bus.subscribe(project_id)
+    return StreamingResponse(
+        event_bus.stream(subscription),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # Keeps GZipMiddleware from buffering the stream
+            "Content-Encoding": "identity",
+        }
+    )
 
 @router.post("/query")
 async def query_buddy(query: QueryRequest) -> QueryResponse:
     """Ask the buddy agent a question"""
     context = context_manager.get_context(query.project_id)
-    response = get_buddy_agent().answer_question(query, context.messages)
+    response = get_buddy_agent().answer_question(query, context.messages,
+                                                 context_manager.get_digest(query.project_id))
     return response
 
 @router.get("/projects")
@@ -2,16 +2,20 @@
 import asyncio
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 import os
 from telegram import Update, Bot
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes
+from telegram.ext import Application, CommandHandler, MessageHandler, TypeHandler, filters, ContextTypes
 from telegram.constants import ParseMode
 
 from ..models.message import Message
+from ..services.chat_stats import format_digest, format_status
 from ..services.context_manager import ContextManager
+from ..services.history_import import file_key, import_file
 from ..services.response_engine import ResponseEngine
 from ..agents.buddy_agent import BuddyAgent
+from ..logging_config import log_extra
+from .update_recorder import UpdateRecorder
 
 logger = logging.getLogger(__name__)
 
@@ -24,31 +28,83 @@ class TelegramBuddy:
         self.context_manager = ContextManager()
         self.response_engine = ResponseEngine()
         self.buddy_agent = None  # Initialize lazily
-        self.bot = Bot(token=self.token)
-        self.application = Application.builder().token(self.token).build()
+        
+        # Aggregates for /status and /digest survive restarts via a snapshot file.
+        # Only the bot reads and writes it: the web service never sees Telegram
+        # messages. Loaded before the history import, which skips the stats of
+        # files the snapshot already counts.
+        self.stats_path = os.getenv("STATS_SNAPSHOT_PATH")
+        self._stats_task = None
+        if self.stats_path:
+            self.context_manager.load_stats(self.stats_path)
+        self._import_history(os.getenv("TELEGRAM_IMPORT_HISTORY", ""))
+        
+        # Point at a different Bot API server (e.g. the load-test fake)
+        base_url = os.getenv("TELEGRAM_API_BASE_URL")
+        builder = Application.builder().token(self.token).post_init(self._post_init).post_shutdown(self._post_shutdown)
+        if base_url:
+            self.bot = Bot(token=self.token, base_url=base_url)
+            builder = builder.base_url(base_url)
+        else:
+            self.bot = Bot(token=self.token)
+        self.application = builder.build()
+        
+        # Optionally record raw updates for replay
+        record_path = os.getenv("TELEGRAM_RECORD_UPDATES")
+        self.recorder = UpdateRecorder(record_path) if record_path else None
         
         # Track which groups the bot is active in
         self.active_groups = set()
         
         self._setup_handlers()
     
+    async def _post_init(self, application: Application):
+        if self.stats_path:
+            self._stats_task = asyncio.create_task(self.context_manager.save_stats_periodically(self.stats_path))
+    
+    async def _post_shutdown(self, application: Application):
+        if self._stats_task:
+            self._stats_task.cancel()
+            self.context_manager.save_stats(self.stats_path)
+    
+    def _import_history(self, paths: str):
+        """Load exports into this process's context at startup.
+        
+        The bot keeps its own in-memory store, separate from the web service's,
+        so history uploaded through /api/import is not visible here.
+        """
+        counted = self.context_manager.imported_files
+        for path in filter(None, paths.split(os.pathsep)):
+            try:
+                key = file_key(path)
+                result = import_file(self.context_manager, path, count_stats=key not in counted)
+                counted.add(key)
+                logger.info("Imported %d messages from %s", result["messages_imported"], path)
+            except (OSError, ValueError) as e:  # unreadable file or malformed export
+                logger.error("Could not import history from %s: %s", path, e)
+    
     def _get_buddy_agent(self):
         """Lazy initialization of BuddyAgent"""
         if self.buddy_agent is None:
             try:
                 self.buddy_agent = BuddyAgent()
             except Exception as e:
-                logger.error(f"Failed to initialize BuddyAgent: {e}")
+                logger.error("Failed to initialize BuddyAgent: %s", e)
                 return None
         return self.buddy_agent
     
     def _setup_handlers(self):
         """Set up telegram command and message handlers"""
+        # Recorder sees every update first, in its own group so it doesn't block other handlers
+        if self.recorder:
+            self.application.add_handler(TypeHandler(Update, self.recorder.record), group=-1)
+        
         # Commands
         self.application.add_handler(CommandHandler("start", self.start_command))
         self.application.add_handler(CommandHandler("help", self.help_command))
         self.application.add_handler(CommandHandler("ask", self.ask_command))
         self.application.add_handler(CommandHandler("status", self.status_command))
+        self.application.add_handler(CommandHandler("digest", self.digest_command))
         self.application.add_handler(CommandHandler("actions", self.actions_command))
         self.application.add_handler(CommandHandler("done", self.done_command))
         
@@ -57,21 +113,24 @@ class TelegramBuddy:
             MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_message)
         )
         
-        # Add a catch-all handler for debugging
-        self.application.add_handler(
-            MessageHandler(filters.ALL, self.debug_handler)
-        )
+        # Add a catch-all handler for debugging (not registered unless DEBUG is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            self.application.add_handler(
+                MessageHandler(filters.ALL, self.debug_handler)
+            )
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         chat_id = update.effective_chat.id
         chat_type = update.effective_chat.type
         
-        logger.info(f"START command received in chat {chat_id} (type: {chat_type})")
+        logger.info("START command received in chat %s (type: %s)", chat_id, chat_type,
+                    extra=log_extra(chat_id, "start"))
         
         if chat_type in ['group', 'supergroup']:
             self.active_groups.add(chat_id)
-            logger.info(f"Activated bot in group {chat_id}. Active groups: {self.active_groups}")
+            logger.info("Activated bot in group %s. Active groups: %d", chat_id, len(self.active_groups),
+                        extra=log_extra(chat_id, "activated"))
             welcome_msg = (
                 "🤖 *Telegram Buddy AI activated!*\n\n"
                 "I'm now listening to your conversations and can help with:\n"
@@ -81,12 +140,13 @@ class TelegramBuddy:
                 "*Commands:*\n"
                 "/ask <question> - Ask me anything about your project\n"
                 "/status - Show current project status\n"
+                "/digest - Weekly activity digest\n"
                 "/actions - List unresolved action items\n"
                 "/help - Show this help message\n\n"
                 "Just mention me (@BuddianBot) or use commands to interact!"
             )
         else:
-            logger.info(f"START command in private chat {chat_id}")
+            logger.info("START command in private chat %s", chat_id, extra=log_extra(chat_id, "start"))
             welcome_msg = (
                 "👋 Hi! I'm Telegram Buddy AI.\n\n"
                 "Add me to your developer groups where I can:\n"
@@ -105,6 +165,7 @@ class TelegramBuddy:
             "*/ask <question>* - Ask about your project\n"
             "   Example: `/ask What's the status of the API integration?`\n\n"
             "*/status* - Show current project overview\n\n"
+            "*/digest* - Weekly digest: activity, most active people, top topics\n\n"
             "*/actions* - List unresolved action items\n\n"
             "*/done <number>* - Mark action item as resolved\n"
             "   Example: `/done 2` to mark item #2 as done\n\n"
@@ -139,8 +200,8 @@ class TelegramBuddy:
             return
         
         try:
-            # Get context for this chat
-            chat_context = self.context_manager.get_context(chat_id)
+            # Get context for this chat (just the thread when /ask is a reply)
+            context_messages = self._context_for(chat_id, update.message.reply_to_message)
             
             # Create QueryRequest object as expected by BuddyAgent
             from ..models.context import QueryRequest
@@ -151,49 +212,46 @@ class TelegramBuddy:
             )
             
             # Generate response
-            response = buddy.answer_question(query_request, chat_context.messages)
+            response = buddy.answer_question(query_request, context_messages,
+                                             self.context_manager.get_digest(chat_id))
             
-            await update.message.reply_text(
+            sent = await update.message.reply_text(
                 f"🤖 *Answer:*\n{response.answer}",
                 parse_mode=ParseMode.MARKDOWN,
                 reply_to_message_id=update.message.message_id
             )
+            self.context_manager.link_reply(chat_id, str(sent.message_id), str(update.message.message_id))
             
         except Exception as e:
-            logger.error(f"Error answering question: {e}")
+            logger.error("Error answering question: %s", e, extra=log_extra(chat_id, "ask_failed"))
             await update.message.reply_text(
                 "❌ Sorry, I encountered an error while processing your question. Please try again."
             )
     
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /status command"""
+        """Handle /status command (answered from precomputed aggregates)"""
         chat_id = str(update.effective_chat.id)
         
         try:
-            chat_context = self.context_manager.get_context(chat_id)
-            
-            if not chat_context.messages:
-                await update.message.reply_text("📭 No messages tracked yet in this chat.")
-                return
-            
-            message_count = len(chat_context.messages)
-            recent_messages = chat_context.messages[-5:]  # Last 5 messages
-            
-            status_msg = f"📊 *Chat Status:*\n\n"
-            status_msg += f"• Total messages tracked: {message_count}\n"
-            status_msg += f"• Recent activity: {len(recent_messages)} messages\n\n"
-            status_msg += "*Recent topics:*\n"
-            
-            for msg in recent_messages[-3:]:  # Show last 3
-                preview = msg.content[:50] + "..." if len(msg.content) > 50 else msg.content
-                status_msg += f"• {preview}\n"
-            
-            await update.message.reply_text(status_msg, parse_mode=ParseMode.MARKDOWN)
+            digest = self.context_manager.get_digest(chat_id)
+            await update.message.reply_text(format_status(digest))
             
         except Exception as e:
-            logger.error(f"Error getting status: {e}")
+            logger.error("Error getting status: %s", e, extra=log_extra(chat_id, "status_failed"))
             await update.message.reply_text("❌ Error retrieving chat status.")
     
+    async def digest_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /digest command"""
+        chat_id = str(update.effective_chat.id)
+        
+        try:
+            digest = self.context_manager.get_digest(chat_id)
+            await update.message.reply_text(format_digest(digest))
+            
+        except Exception as e:
+            logger.error("Error building digest: %s", e, extra=log_extra(chat_id, "digest_failed"))
+            await update.message.reply_text("❌ Error building chat digest.")
+    
     async def done_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /done command to mark action items as resolved"""
         if not context.args:
@@ -226,7 +284,7 @@ class TelegramBuddy:
                 "Please provide a valid number. Example: `/done 2`"
             )
         except Exception as e:
-            logger.error(f"Error marking action as done: {e}")
+            logger.error("Error marking action as done: %s", e)
             await update.message.reply_text("❌ Error marking action as resolved.")
     
     async def actions_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -250,28 +308,38 @@ class TelegramBuddy:
             await update.message.reply_text(actions_msg, parse_mode=ParseMode.MARKDOWN)
             
         except Exception as e:
-            logger.error(f"Error getting actions: {e}")
+            logger.error("Error getting actions: %s", e, extra=log_extra(chat_id, "actions_failed"))
             await update.message.reply_text("❌ Error retrieving action items.")
     
     async def debug_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Debug handler to see all messages"""
-        if update.message:
-            logger.info(f"DEBUG: Received message type: {update.message.content_type}")
-            logger.info(f"DEBUG: Message text: {update.message.text}")
-            logger.info(f"DEBUG: Chat type: {update.effective_chat.type}")
-            logger.info(f"DEBUG: Chat ID: {update.effective_chat.id}")
-            logger.info(f"DEBUG: Active groups: {self.active_groups}")
+        if update.message and logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Update: type=%s chat=%s (%s) active=%s text=%r",
+                update.message.content_type, update.effective_chat.id, update.effective_chat.type,
+                update.effective_chat.id in self.active_groups, update.message.text,
+                extra=log_extra(update.effective_chat.id, "debug_update", routine=True)
+            )
+    
+    def _context_for(self, chat_id: str, telegram_message) -> List[Message]:
+        """Context for answering ``telegram_message``: its reply thread if it is
+        part of one, otherwise the chat's recent messages
+        """
+        if telegram_message is not None:
+            thread = self.context_manager.get_thread(chat_id, str(telegram_message.message_id))
+            if len(thread) > 1:
+                return thread
+        return self.context_manager.get_context(chat_id).messages
     
     async def handle_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle regular messages in the group"""
-        logger.info(f"Received message: {update.message.text[:50]}... from {update.effective_user.username}")
-        
         chat_id = str(update.effective_chat.id)
         
         # Process all messages in private chats, but only activated groups
         if update.effective_chat.type in ['group', 'supergroup']:
             if int(chat_id) not in self.active_groups:
-                logger.info(f"Bot not activated in group {chat_id}, ignoring message")
+                logger.debug("Bot not activated in group %s, ignoring message", chat_id,
+                             extra=log_extra(chat_id, "ignored", routine=True))
                 return
         
         # Create message object
@@ -282,24 +350,24 @@ class TelegramBuddy:
             channel_id=chat_id,
             user_id=str(update.effective_user.id),
             message_id=str(update.message.message_id),
+            reply_to_id=str(update.message.reply_to_message.message_id) if update.message.reply_to_message else None,
             metadata={
                 "username": update.effective_user.username or "Unknown",
                 "first_name": update.effective_user.first_name or "Unknown",
-                "chat_title": update.effective_chat.title or "Private Chat"
+                "chat_title": update.effective_chat.title or "Private Chat",
+                "forwarded": update.message.forward_date is not None
             }
         )
         
-        logger.info(f"Processing message from {message.metadata['username']}: {message.content[:50]}...")
-        
         # ALWAYS store message in context (this was the bug!)
         self.context_manager.add_message(message)
-        logger.info(f"Message added to context for channel {chat_id}")
         
         # Check if bot was mentioned or should respond
         bot_mentioned = "@BuddianBot" in update.message.text or "@buddianbot" in update.message.text.lower()
         should_respond = self.response_engine.should_respond(message, bot_mentioned)
         
-        logger.info(f"Bot mentioned: {bot_mentioned}, Should respond: {should_respond}")
+        logger.info("Message from %s (mentioned=%s, respond=%s)", message.metadata["username"],
+                    bot_mentioned, should_respond, extra=log_extra(chat_id, "message", routine=True))
         
         # Only respond if explicitly mentioned or asked a question, but ALWAYS track the message
         if should_respond:
@@ -322,20 +390,24 @@ class TelegramBuddy:
                         timestamp=datetime.now()
                     )
                     
-                    chat_context = self.context_manager.get_context(chat_id)
-                    response_obj = buddy.answer_question(query_request, chat_context.messages)
+                    context_messages = self._context_for(chat_id, update.message)
+                    response_obj = buddy.answer_question(query_request, context_messages,
+                                                         self.context_manager.get_digest(chat_id))
                     
                     if response_obj and response_obj.answer:
                         answer = response_obj.answer.strip()
                         
                         if len(answer) > 20:
-                            logger.info(f"Sending response: {answer[:50]}...")
-                            await update.message.reply_text(
+                            logger.info("Sending response (%d chars)", len(answer),
+                                        extra=log_extra(chat_id, "reply"))
+                            sent = await update.message.reply_text(
                                 f"🤖 {answer}",
                                 reply_to_message_id=update.message.message_id
                             )
+                            # Replies to our answer continue the same thread
+                            self.context_manager.link_reply(chat_id, str(sent.message_id), message.message_id)
                 except Exception as e:
-                    logger.error(f"Error generating response: {e}")
+                    logger.error("Error generating response: %s", e, extra=log_extra(chat_id, "reply_failed"))
             else:
                 logger.warning("BuddyAgent not available")
     
@@ -344,15 +416,19 @@ class TelegramBuddy:
         logger.info("Starting Telegram Buddy AI bot...")
         logger.info("Bot handlers registered:")
         for handler in self.application.handlers[0]:  # Default group
-            logger.info(f"  - {type(handler).__name__}: {handler}")
+            logger.info("  - %s: %s", type(handler).__name__, handler)
         
         # Add error handler
         async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
-            logger.error(f"Exception while handling an update: {context.error}")
+            logger.error("Exception while handling an update: %s", context.error)
         
         self.application.add_error_handler(error_handler)
         
-        self.application.run_polling(drop_pending_updates=True)
+        try:
+            self.application.run_polling(drop_pending_updates=True)
+        finally:
+            if self.recorder:
+                self.recorder.close()
 
 # app/services/response_engine.py - Add this method
 class ResponseEngine:
@@ -0,0 +1,42 @@
+# app/connectors/update_recorder.py
+"""
+Records raw Telegram updates as newline-delimited JSON.
+
+Enable with TELEGRAM_RECORD_UPDATES=/path/to/updates.ndjson; the file can be
+replayed with ``python -m benchmarks.loadtest --updates <file>``.
+"""
+import json
+import logging
+import time
+
+from telegram import Update
+from telegram.ext import ContextTypes
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateRecorder:
+    def __init__(self, path: str, flush_every: int = 100):
+        self.path = path
+        self.flush_every = flush_every
+        self._file = open(path, "a", encoding="utf-8")
+        self._pending = 0
+        logger.info("Recording Telegram updates to %s", path)
+
+    async def record(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Append the update to the recording (registered as a TypeHandler)"""
+        if self._file.closed:
+            return
+
+        data = update.to_dict()
+        data["_received_at"] = time.time()
+        self._file.write(json.dumps(data, separators=(",", ":")) + "\n")
+
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
@@ -0,0 +1,123 @@
+# app/logging_config.py
+"""
+Logging setup shared by the web app and the Telegram runner.
+
+Records are handed to a queue on the calling thread and formatted/written by
+a background listener, so the event loop never blocks on stderr. Messages use
+%-style arguments so they are only formatted if a handler actually emits them.
+
+Profiles (LOG_PROFILE):
+- development: human readable lines, DEBUG enabled, no sampling
+- production:  one JSON object per line, INFO and above, routine per-chat
+               events sampled (LOG_SAMPLE_EVERY, default 20)
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Dict, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Attributes present on every LogRecord; anything else came in via ``extra``
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def log_extra(chat_id=None, event: Optional[str] = None, routine: bool = False) -> Dict:
+    """Build the ``extra`` dict for a structured log call"""
+    extra = {"routine": routine}
+    if chat_id is not None:
+        extra["chat_id"] = str(chat_id)
+    if event:
+        extra["event"] = event
+    return extra
+
+
+class ChatSamplingFilter(logging.Filter):
+    """Let through only every Nth routine record per chat.
+
+    Records without ``routine=True`` (warnings, errors, lifecycle events) are
+    never sampled out.
+    """
+    def __init__(self, every: int = 20):
+        super().__init__()
+        self.every = max(1, every)
+        self._counters: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.every == 1 or not getattr(record, "routine", False):
+            return True
+
+        chat_id = getattr(record, "chat_id", None)
+        count = self._counters.get(chat_id, 0)
+        self._counters[chat_id] = count + 1
+        return count % self.every == 0
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that defers formatting to the listener thread.
+
+    The stock handler formats the message in ``prepare()`` on the caller's
+    thread. Our records stay in-process, so we enqueue them untouched.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON including ``extra`` fields"""
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and key != "routine":
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def configure_logging(profile: Optional[str] = None) -> str:
+    """Install the queue-based logging pipeline on the root logger.
+
+    Safe to call more than once; later calls are no-ops. Returns the active
+    profile name.
+    """
+    global _listener
+
+    profile = (profile or os.getenv("LOG_PROFILE", "development")).lower()
+    if _listener is not None:
+        return profile
+
+    production = profile == "production"
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter() if production else logging.Formatter(TEXT_FORMAT))
+
+    queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    if production:
+        queue_handler.addFilter(ChatSamplingFilter(int(os.getenv("LOG_SAMPLE_EVERY", "20"))))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO" if production else "DEBUG").upper())
+
+    # Third-party HTTP clients are chatty at DEBUG
+    for noisy in ("httpx", "httpcore", "telegram", "openai"):
+        logging.getLogger(noisy).setLevel(logging.WARNING if production else logging.INFO)
+
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    return profile
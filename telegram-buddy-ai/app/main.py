@@ -1,12 +1,15 @@
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 import os
 from dotenv import load_dotenv
 
 from .api.routes import router
+from .logging_config import configure_logging
 
 load_dotenv()
+configure_logging()
 
 app = FastAPI(
     title="Telegram Buddy AI",
@@ -14,6 +17,9 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Compress large responses (context pages, action lists)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Include API routes
 app.include_router(router, prefix="/api")
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 from datetime import datetime
 from .message import Message, ActionItem
 
@@ -10,6 +10,31 @@ class ConversationContext(BaseModel):
     last_updated: datetime
     summary: str = ""
 
+class ContextPage(BaseModel):
+    """One page of a project's messages.
+    
+    Messages are oldest first; message i has sequence number first_seq + i.
+    Pass latest_seq as ``since`` to fetch only newer messages, or
+    next_cursor as ``cursor`` to fetch the previous (older) page.
+    """
+    project_id: str
+    messages: List[Message] = []
+    first_seq: Optional[int] = None
+    latest_seq: int = 0
+    total_messages: int = 0
+    next_cursor: Optional[int] = None
+    has_more: bool = False
+    last_updated: datetime
+
+class ActionPage(BaseModel):
+    """One page of action items, paginated by action_id like ContextPage"""
+    project_id: str
+    action_items: List[ActionItem] = []
+    latest_id: int = 0
+    total: int = 0
+    next_cursor: Optional[int] = None
+    has_more: bool = False
+
 class QueryRequest(BaseModel):
     question: str
     project_id: str = "default"
@@ -9,6 +9,8 @@ class Message(BaseModel):
     channel_id: str = "default"
     user_id: str = "user"
     message_id: str
+    reply_to_id: Optional[str] = None
+    repeat_count: int = 1  # > 1 when later duplicates were collapsed into this message
     metadata: Dict = {}
 
 class ActionItem(BaseModel):
@@ -17,6 +19,7 @@ class ActionItem(BaseModel):
     assigned_to: Optional[str] = None
     status: str = "unresolved"
     project_id: str = "default"
+    action_id: Optional[int] = None
 
 class ProjectTag(BaseModel):
     project_id: str
@@ -0,0 +1,282 @@
+# app/services/chat_stats.py
+"""
+Per-chat aggregates maintained incrementally as messages arrive.
+
+ChatStats keeps hourly message counts, per-day user and term counters and
+action item counts for the last week, so /status, /digest and general status
+questions are answered from memory without re-scanning messages or calling
+the LLM. The aggregates are small and serialize to a JSON snapshot that is
+loaded at startup instead of replaying history.
+"""
+import json
+import logging
+import os
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from ..models.message import Message
+
+logger = logging.getLogger(__name__)
+
+HOURS_KEPT = 7 * 24
+MAX_TERMS_PER_DAY = 2000
+MAX_TERM_CHARS = 1000
+
+# Words, not @mentions or fragments of longer tokens
+_TERM = re.compile(r"(?<![@\w])[a-z][a-z0-9]{2,}")
+
+STOPWORDS = frozenset("""
+    about after again all also and any anyone are around back been before being but can
+    could did does doing done don down for from get getting going gonna got had has have
+    hey her here him his how into its just know let like look looks lot make many may
+    maybe more most much need now off okay one only our out over please pretty really
+    right said same say see should since some still sure than thank thanks that the
+    their them then there these they thing things think this those through today too
+    try want was way well were what when where which while who why will with would yeah
+    yes yet you your buddianbot
+""".split())
+
+# General status questions name one of these explicitly and otherwise only
+# filler; small talk ("how's it going?") still goes to the LLM
+STATUS_WORDS = frozenset("""
+    status progress digest summary summarize summarise overview
+""".split())
+_STATUS_FILLER = frozenset("""
+    whats hows a an is on of in at to it its so far me us we quick overall current currently
+    latest week chat group team project projects everyone everybody guys folks give tell
+""".split())
+
+_SPARK = "▁▂▃▄▅▆▇█"
+
+
+def _hour_key(timestamp: datetime) -> int:
+    return timestamp.toordinal() * 24 + timestamp.hour
+
+
+def _hour_start(hour: int) -> datetime:
+    return datetime.fromordinal(hour // 24) + timedelta(hours=hour % 24)
+
+
+def _user_name(message: Message) -> str:
+    name = message.metadata.get("username")
+    if not name or name == "Unknown":
+        name = message.metadata.get("first_name") or message.user_id
+    return name
+
+
+class ChatStats:
+    """Running aggregates for one chat"""
+    def __init__(self, channel_id: str):
+        self.channel_id = channel_id
+        self.total_messages = 0
+        self.repeats = 0
+        self.first_message_at: Optional[datetime] = None
+        self.last_message_at: Optional[datetime] = None
+        self.actions_open = 0
+        self.actions_resolved = 0
+
+        # hour key -> messages; day ordinal -> Counter of users / terms
+        self.hourly: Dict[int, int] = {}
+        self.users: Dict[int, Counter] = {}
+        self.terms: Dict[int, Counter] = {}
+        self._latest_hour = 0
+
+    @classmethod
+    def from_messages(cls, messages: Iterable[Message], channel_id: str = "default") -> "ChatStats":
+        stats = cls(channel_id)
+        for message in messages:
+            stats.add_message(message)
+        return stats
+
+    def add_message(self, message: Message):
+        timestamp = message.timestamp
+        self.total_messages += 1
+        if self.first_message_at is None or timestamp < self.first_message_at:
+            self.first_message_at = timestamp
+        if self.last_message_at is None or timestamp > self.last_message_at:
+            self.last_message_at = timestamp
+
+        hour = _hour_key(timestamp)
+        if hour > self._latest_hour:
+            self._latest_hour = hour
+            self._evict()
+        elif hour <= self._latest_hour - HOURS_KEPT:
+            return  # older than the kept window (e.g. imported history)
+
+        self.hourly[hour] = self.hourly.get(hour, 0) + 1
+        day = hour // 24
+        users = self.users.get(day)
+        if users is None:
+            users = self.users[day] = Counter()
+            self.terms[day] = Counter()
+        users[_user_name(message)] += 1
+
+        terms = self.terms[day]
+        terms.update(term for term in _TERM.findall(message.content[:MAX_TERM_CHARS].lower())
+                     if term not in STOPWORDS)
+        if len(terms) > MAX_TERMS_PER_DAY:
+            # Amortized: only rare terms are dropped, and only every so often
+            self.terms[day] = Counter(dict(terms.most_common(MAX_TERMS_PER_DAY // 2)))
+
+    def _evict(self):
+        cutoff = self._latest_hour - HOURS_KEPT
+        for hour in [hour for hour in self.hourly if hour <= cutoff]:
+            del self.hourly[hour]
+        for day in [day for day in self.users if day < cutoff // 24]:
+            del self.users[day]
+            del self.terms[day]
+
+    def digest(self, now: Optional[datetime] = None, top: int = 5) -> Dict:
+        """JSON-ready view of the aggregates as of ``now``"""
+        now = now or datetime.now()
+        current = _hour_key(now)
+        hourly = [self.hourly.get(hour, 0) for hour in range(current - 23, current + 1)]
+        week = [(hour, count) for hour, count in self.hourly.items() if current - HOURS_KEPT < hour <= current]
+        busiest = max(week, key=lambda item: item[1], default=None)
+
+        users: Counter = Counter()
+        terms: Counter = Counter()
+        first_day = (current - HOURS_KEPT) // 24
+        for day, counter in self.users.items():
+            if day >= first_day:
+                users.update(counter)
+                terms.update(self.terms[day])
+
+        return {
+            "channel_id": self.channel_id,
+            "generated_at": now.isoformat(),
+            "total_messages": self.total_messages,
+            "repeats_collapsed": self.repeats,
+            "first_message_at": self.first_message_at.isoformat() if self.first_message_at else None,
+            "last_message_at": self.last_message_at.isoformat() if self.last_message_at else None,
+            "messages_last_24h": sum(hourly),
+            "messages_last_7d": sum(count for _, count in week),
+            "hourly_last_24h": hourly,
+            "busiest_hour": _hour_start(busiest[0]).isoformat() if busiest else None,
+            "top_users": users.most_common(top),
+            "top_terms": terms.most_common(top * 2),
+            "actions": {"open": self.actions_open, "resolved": self.actions_resolved},
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            "channel_id": self.channel_id,
+            "total_messages": self.total_messages,
+            "repeats": self.repeats,
+            "first_message_at": self.first_message_at.isoformat() if self.first_message_at else None,
+            "last_message_at": self.last_message_at.isoformat() if self.last_message_at else None,
+            "hourly": self.hourly,
+            "users": self.users,
+            "terms": self.terms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "ChatStats":
+        stats = cls(data["channel_id"])
+        stats.total_messages = data.get("total_messages", 0)
+        stats.repeats = data.get("repeats", 0)
+        if data.get("first_message_at"):
+            stats.first_message_at = datetime.fromisoformat(data["first_message_at"])
+        if data.get("last_message_at"):
+            stats.last_message_at = datetime.fromisoformat(data["last_message_at"])
+        # JSON object keys come back as strings
+        stats.hourly = {int(hour): count for hour, count in data.get("hourly", {}).items()}
+        stats.users = {int(day): Counter(counts) for day, counts in data.get("users", {}).items()}
+        stats.terms = {int(day): Counter(counts) for day, counts in data.get("terms", {}).items()}
+        for day in stats.users:
+            stats.terms.setdefault(day, Counter())
+        stats._latest_hour = max(stats.hourly, default=0)
+        return stats
+
+
+def is_status_question(question: str) -> bool:
+    """True for general questions like "what's the status?" or "give me a quick
+    summary", which the digest answers; specific ones go to the LLM
+    """
+    words = set(re.findall(r"[a-z]+", question.lower().replace("'", "")))
+    return bool(words & STATUS_WORDS) and not (words - STATUS_WORDS - _STATUS_FILLER - STOPWORDS)
+
+
+def _pairs(pairs: List, limit: int) -> str:
+    return ", ".join(f"{name} ({count})" for name, count in pairs[:limit])
+
+
+def format_status(digest: Dict) -> str:
+    """Short plain-text status for /status and status questions"""
+    if not digest["total_messages"]:
+        return "📭 No messages tracked yet in this chat."
+
+    lines = [
+        "📊 Chat status",
+        "",
+        f"• Messages tracked: {digest['total_messages']} ({digest['messages_last_24h']} in the last 24h)",
+        f"• Action items: {digest['actions']['open']} open, {digest['actions']['resolved']} resolved",
+    ]
+    if digest["top_users"]:
+        lines.append(f"• Most active this week: {_pairs(digest['top_users'], 3)}")
+    if digest["top_terms"]:
+        lines.append(f"• Main topics: {', '.join(term for term, _ in digest['top_terms'][:5])}")
+    if digest["last_message_at"]:
+        lines.append(f"• Last message: {digest['last_message_at'][:16].replace('T', ' ')}")
+    return "\n".join(lines)
+
+
+def format_digest(digest: Dict) -> str:
+    """Longer plain-text weekly digest for /digest"""
+    if not digest["total_messages"]:
+        return "📭 No messages tracked yet in this chat."
+
+    hourly = digest["hourly_last_24h"]
+    peak = max(hourly) or 1
+    sparkline = "".join(_SPARK[min(len(_SPARK) - 1, count * len(_SPARK) // (peak + 1))] for count in hourly)
+
+    lines = [
+        "🗞 Chat digest (last 7 days)",
+        "",
+        f"Messages: {digest['messages_last_7d']} this week, {digest['messages_last_24h']} in the last 24h, "
+        f"{digest['total_messages']} in total",
+        f"Last 24h by hour: {sparkline}",
+    ]
+    if digest["busiest_hour"]:
+        lines.append(f"Busiest hour: {digest['busiest_hour'][:16].replace('T', ' ')}")
+    if digest["repeats_collapsed"]:
+        lines.append(f"Repeated posts collapsed: {digest['repeats_collapsed']}")
+    lines.append(f"Action items: {digest['actions']['open']} open, {digest['actions']['resolved']} resolved")
+    if digest["top_users"]:
+        lines += ["", "Most active:"] + [f"• {name}: {count} messages" for name, count in digest["top_users"]]
+    if digest["top_terms"]:
+        lines += ["", "Top topics: " + _pairs(digest["top_terms"], 10)]
+    return "\n".join(lines)
+
+
+def save_snapshot(stats: Dict[str, ChatStats], path: str, imports: Iterable[str] = ()):
+    """Write all chats' aggregates to ``path`` atomically, with the keys of the
+    history files (see history_import.file_key) they already include
+    """
+    data = json.dumps({"version": 1, "chats": [chat.to_dict() for chat in stats.values()],
+                       "imports": sorted(imports)})
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str) -> Tuple[Dict[str, ChatStats], Set[str]]:
+    """Aggregates and import keys saved by ``save_snapshot``; empty if the file
+    is missing or unreadable
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        stats = {chat["channel_id"]: ChatStats.from_dict(chat) for chat in data.get("chats", [])}
+        return stats, set(data.get("imports", []))
+    except FileNotFoundError:
+        return {}, set()
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning("Ignoring unreadable stats snapshot %s: %s", path, e)
+        return {}, set()
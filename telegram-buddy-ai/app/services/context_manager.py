@@ -1,13 +1,30 @@
 # app/services/context_manager.py
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Set, Tuple
 from datetime import datetime, timedelta
+import asyncio
 import logging
 
 from ..models.message import Message
 from ..models.context import ConversationContext
+from ..logging_config import log_extra
+from .chat_stats import ChatStats, load_snapshot, save_snapshot
+from .dedup import DuplicateDetector
+from .event_bus import EventBus
+from .reply_graph import ReplyGraph
 
 logger = logging.getLogger(__name__)
 
+# Keywords that suggest action items
+ACTION_KEYWORDS = [
+    'need to', 'should', 'must', 'todo', 'task', 'action',
+    'deadline', 'by tomorrow', 'by friday', 'urgent', 'asap',
+    'please', 'can you', 'could you', 'remember to'
+]
+
+# Messages get_context returns when nothing falls in the lookback window
+# (e.g. a chat known only from imported history)
+FALLBACK_MESSAGES = 20
+
 class ActionItem:
     """Simple action item class"""
     def __init__(self, description: str, mentioned_at: datetime, assigned_to: Optional[str] = None):
@@ -15,47 +32,198 @@ class ActionItem:
         self.mentioned_at = mentioned_at
         self.assigned_to = assigned_to
         self.status = "unresolved"
+        self.action_id: Optional[int] = None  # assigned by ContextManager, increasing per channel
+
+    def to_event(self) -> Dict:
+        return {
+            "action_id": self.action_id,
+            "description": self.description,
+            "mentioned_at": self.mentioned_at.isoformat(),
+            "assigned_to": self.assigned_to,
+            "status": self.status,
+        }
 
 class ContextManager:
-    def __init__(self):
+    def __init__(self, event_bus: Optional[EventBus] = None):
         self.contexts: Dict[str, ConversationContext] = {}
+        self.reply_graphs: Dict[str, ReplyGraph] = {}
+        self.duplicate_detectors: Dict[str, DuplicateDetector] = {}
+        self.stats: Dict[str, ChatStats] = {}
+        self._digests: Dict[str, Tuple[Tuple, Dict]] = {}  # channel -> ((version, hour), digest)
+        self.event_bus = event_bus
         self.action_items: Dict[str, List[ActionItem]] = {}
-    
-    def add_message(self, message: Message, projects: Optional[List] = None):
-        """Add a message to the context for a channel"""
-        channel_id = message.channel_id
         
+        # Per-channel counters: messages ever added (message i of the window has
+        # sequence number total - len(window) + i + 1), action ids handed out,
+        # repeats collapsed into earlier messages, and a version bumped on
+        # every change (used for ETags)
+        self.message_totals: Dict[str, int] = {}
+        self.duplicate_totals: Dict[str, int] = {}
+        self.action_totals: Dict[str, int] = {}
+        self.versions: Dict[str, int] = {}
+        self.last_updated: Dict[str, datetime] = {}
+        
+        # History files already included in self.stats, and the version sum
+        # when the stats snapshot was loaded (see load_stats)
+        self.imported_files: Set[str] = set()
+        self._snapshot_state = 0
+    
+    def _ensure_context(self, channel_id: str) -> ConversationContext:
         if channel_id not in self.contexts:
+            self.reply_graphs[channel_id] = ReplyGraph()
+            self.duplicate_detectors[channel_id] = DuplicateDetector()
+            if channel_id not in self.stats:  # may already be loaded from a snapshot
+                self.stats[channel_id] = ChatStats(channel_id)
             self.contexts[channel_id] = ConversationContext(
                 channel_id=channel_id,
                 messages=[],
                 project_id="default",  # Add default project_id
                 last_updated=datetime.now()  # Add current timestamp
             )
+        return self.contexts[channel_id]
+    
+    def _touch(self, channel_id: str):
+        """Record that a channel's messages or action items changed"""
+        self.versions[channel_id] = self.versions.get(channel_id, 0) + 1
+        # Kept outside the pydantic model: attribute assignment there is costly on this path
+        self.last_updated[channel_id] = datetime.now()
+    
+    def _publish(self, channel_id: str, event: str, payload: Callable[[], Dict]):
+        """Push an event to live subscribers; payload is only built if someone listens"""
+        if self.event_bus and self.event_bus.has_subscribers(channel_id):
+            self.event_bus.publish(channel_id, event, payload())
+    
+    def _record_repeat(self, original: Message, repeat: Message, count_stats: bool = True):
+        """Collapse ``repeat`` into the stored ``original``"""
+        channel_id = original.channel_id
+        original.repeat_count += 1
+        self.duplicate_totals[channel_id] = self.duplicate_totals.get(channel_id, 0) + 1
+        if count_stats:
+            self.stats[channel_id].repeats += 1
+        # The copy keeps its own place in the reply graph, not the original's:
+        # a question asked again later belongs with what it replies to, if anything
+        if repeat.reply_to_id:
+            self.reply_graphs[channel_id].link(repeat.message_id, repeat.reply_to_id)
+    
+    def _store_action_items(self, channel_id: str, items: List[ActionItem]):
+        next_id = self.action_totals.get(channel_id, 0)
+        for item in items:
+            next_id += 1
+            item.action_id = next_id
+        self.action_totals[channel_id] = next_id
+        
+        # Limit action items (keep last 50)
+        stored = self.action_items.setdefault(channel_id, [])
+        stored.extend(items)
+        dropped = stored[:-50]
+        del stored[:-50]
+        
+        # Items pushed out of the list can no longer be resolved
+        stats = self.stats.get(channel_id) or self.stats.setdefault(channel_id, ChatStats(channel_id))
+        stats.actions_open += len(items) - sum(1 for item in dropped if item.status == "unresolved")
+    
+    def add_message(self, message: Message, projects: Optional[List] = None) -> Optional[ActionItem]:
+        """Add a message to the context for a channel.
+        
+        Returns the action item detected in the message, if any. Repeats of a
+        recent message are not stored; the original's repeat_count goes up.
+        """
+        channel_id = message.channel_id
+        self._ensure_context(channel_id)
+        
+        original = self.duplicate_detectors[channel_id].check(message)
+        if original is not None:
+            self._record_repeat(original, message)
+            self._touch(channel_id)
+            self._publish(channel_id, "message_repeated", lambda: {
+                "message_id": original.message_id,
+                "repeat_count": original.repeat_count
+            })
+            logger.debug("Collapsed repeated message in channel %s", channel_id,
+                         extra=log_extra(channel_id, "message_repeated", routine=True))
+            return None
         
         # Add message to context
         self.contexts[channel_id].messages.append(message)
+        self.message_totals[channel_id] = self.message_totals.get(channel_id, 0) + 1
+        self.stats[channel_id].add_message(message)
         
-        # Limit context size (keep last 100 messages)
+        # Limit context size (keep last 100 messages), in place
         if len(self.contexts[channel_id].messages) > 100:
-            self.contexts[channel_id].messages = self.contexts[channel_id].messages[-100:]
+            del self.contexts[channel_id].messages[:-100]
+        
+        self.reply_graphs[channel_id].add(message)
+        self._touch(channel_id)
+        self._publish(channel_id, "message_added", lambda: {
+            "seq": self.message_totals[channel_id],
+            "message": message.model_dump(mode="json")
+        })
         
         # Detect action items
-        self._detect_action_items(message)
+        action_item = self._detect_action_items(message)
         
-        logger.info(f"Added message to context for channel {channel_id}")
+        logger.debug("Added message to context for channel %s", channel_id,
+                     extra=log_extra(channel_id, "message_added", routine=True))
+        return action_item
     
-    def get_context(self, channel_id: str, lookback_hours: int = 24) -> ConversationContext:
-        """Get conversation context for a channel"""
-        if channel_id not in self.contexts:
-            self.contexts[channel_id] = ConversationContext(
-                channel_id=channel_id,
-                messages=[],
-                project_id="default",  # Add default project_id
-                last_updated=datetime.now()  # Add current timestamp
-            )
+    def add_messages(self, messages: List[Message], count_stats: bool = True) -> int:
+        """Bulk insert (history import): trims and indexes once per channel
+        instead of once per message. Returns the number of action items found.
+        
+        With ``count_stats=False`` the messages are left out of the chat
+        aggregates (they are already in a loaded stats snapshot).
+        """
+        by_channel: Dict[str, List[Message]] = {}
+        for message in messages:
+            by_channel.setdefault(message.channel_id, []).append(message)
+        
+        found = 0
+        for channel_id, channel_messages in by_channel.items():
+            context = self._ensure_context(channel_id)
+            
+            detector = self.duplicate_detectors[channel_id]
+            unique = []
+            for message in channel_messages:
+                original = detector.check(message)
+                if original is None:
+                    unique.append(message)
+                else:
+                    self._record_repeat(original, message, count_stats)
+            repeats = len(channel_messages) - len(unique)
+            channel_messages = unique
+            
+            # Only the tail can survive the 100-message window
+            context.messages.extend(channel_messages[-100:])
+            del context.messages[:-100]
+            self.message_totals[channel_id] = self.message_totals.get(channel_id, 0) + len(channel_messages)
+            if count_stats:
+                stats = self.stats[channel_id]
+                for message in channel_messages:
+                    stats.add_message(message)
+            self.reply_graphs[channel_id].add_many(channel_messages)
+            
+            items = [item for item in map(self._match_action_item, channel_messages) if item]
+            if items:
+                found += len(items)
+                self._store_action_items(channel_id, items)
+            self._touch(channel_id)
+            # One summary event per batch rather than thousands of message_added
+            self._publish(channel_id, "messages_imported", lambda: {
+                "count": len(channel_messages),
+                "repeats": repeats,
+                "latest_seq": self.message_totals[channel_id],
+                "action_items": len(items)
+            })
         
-        context = self.contexts[channel_id]
+        logger.debug("Bulk added %d messages to %d channels (%d action items)",
+                    len(messages), len(by_channel), found)
+        return found
+    
+    def get_context(self, channel_id: str, lookback_hours: int = 24) -> ConversationContext:
+        """Get conversation context for a channel: messages from the last
+        ``lookback_hours``, or the newest stored ones if there are none
+        """
+        context = self._ensure_context(channel_id)
         
         # Filter messages by lookback period if specified
         if lookback_hours > 0:
@@ -64,6 +232,8 @@ class ContextManager:
                 msg for msg in context.messages 
                 if msg.timestamp > cutoff_time
             ]
+            if not recent_messages:
+                recent_messages = context.messages[-FALLBACK_MESSAGES:]
             # Create a filtered context object
             filtered_context = ConversationContext(
                 channel_id=channel_id,
@@ -75,59 +245,148 @@ class ContextManager:
         
         return context
     
+    def get_sequenced_messages(self, channel_id: str) -> List[Tuple[int, Message]]:
+        """All stored messages for a channel with their sequence numbers (no lookback filter)"""
+        context = self.contexts.get(channel_id)
+        if context is None:
+            return []
+        first = self.message_totals.get(channel_id, 0) - len(context.messages) + 1
+        return list(enumerate(context.messages, first))
+    
+    def get_thread(self, channel_id: str, message_id: str, limit: int = 50) -> List[Message]:
+        """Messages in the reply thread containing ``message_id``, oldest first"""
+        graph = self.reply_graphs.get(channel_id)
+        return graph.thread(message_id, limit) if graph else []
+    
+    def link_reply(self, channel_id: str, reply_id: str, parent_id: str):
+        """Record a reply we don't store as a message, e.g. the bot's own answer,
+        so follow-up replies to it still resolve to the same thread
+        """
+        graph = self.reply_graphs.get(channel_id)
+        if graph is not None:
+            graph.link(reply_id, parent_id)
+    
+    def get_unresolved_actions(self, channel_id: str) -> List[ActionItem]:
+        """Action items for a channel that are still open"""
+        return [item for item in self.action_items.get(channel_id, []) if item.status == "unresolved"]
+    
+    def get_version(self, channel_id: str) -> int:
+        """Changes whenever the channel's messages or action items change"""
+        return self.versions.get(channel_id, 0)
+    
+    def list_projects(self) -> List[str]:
+        """Channels/projects with stored context"""
+        return list(self.contexts)
+    
     def get_unresolved_items(self, channel_id: str) -> List[ActionItem]:
         """Get unresolved action items for a channel"""
         return self.action_items.get(channel_id, [])
     
-    def _detect_action_items(self, message: Message):
-        """Simple action item detection"""
+    def _match_action_item(self, message: Message) -> Optional[ActionItem]:
+        """Build an action item if the message looks like one"""
         content = message.content.lower()
         
-        # Keywords that suggest action items
-        action_keywords = [
-            'need to', 'should', 'must', 'todo', 'task', 'action',
-            'deadline', 'by tomorrow', 'by friday', 'urgent', 'asap',
-            'please', 'can you', 'could you', 'remember to'
-        ]
+        if not any(keyword in content for keyword in ACTION_KEYWORDS):
+            return None
+        
+        # Extract assigned person if mentioned
+        assigned_to = None
+        if '@' in message.content:
+            # Simple extraction - you could make this more sophisticated
+            words = message.content.split()
+            for word in words:
+                if word.startswith('@'):
+                    assigned_to = word[1:]  # Remove @ symbol
+                    break
         
-        # Assignment patterns
-        assignment_patterns = ['@', 'assigned to', 'responsibility of']
+        return ActionItem(
+            description=message.content,
+            mentioned_at=message.timestamp,
+            assigned_to=assigned_to
+        )
+    
+    def _detect_action_items(self, message: Message) -> Optional[ActionItem]:
+        """Simple action item detection"""
+        action_item = self._match_action_item(message)
         
-        if any(keyword in content for keyword in action_keywords):
+        if action_item:
             channel_id = message.channel_id
+            self._store_action_items(channel_id, [action_item])
+            self._publish(channel_id, "action_detected", action_item.to_event)
             
-            if channel_id not in self.action_items:
-                self.action_items[channel_id] = []
-            
-            # Extract assigned person if mentioned
-            assigned_to = None
-            if '@' in message.content:
-                # Simple extraction - you could make this more sophisticated
-                words = message.content.split()
-                for word in words:
-                    if word.startswith('@'):
-                        assigned_to = word[1:]  # Remove @ symbol
-                        break
-            
-            action_item = ActionItem(
-                description=message.content,
-                mentioned_at=message.timestamp,
-                assigned_to=assigned_to
-            )
-            
-            self.action_items[channel_id].append(action_item)
-            
-            # Limit action items (keep last 50)
-            if len(self.action_items[channel_id]) > 50:
-                self.action_items[channel_id] = self.action_items[channel_id][-50:]
-            
-            logger.info(f"Detected action item in channel {channel_id}: {message.content[:50]}...")
+            logger.info("Detected action item in channel %s: %.50s...", channel_id, message.content,
+                        extra=log_extra(channel_id, "action_detected", routine=True))
+        
+        return action_item
     
-    def mark_action_resolved(self, channel_id: str, action_index: int):
+    def mark_action_resolved(self, channel_id: str, action_index: int) -> bool:
         """Mark an action item as resolved"""
         if channel_id in self.action_items and 0 <= action_index < len(self.action_items[channel_id]):
-            self.action_items[channel_id][action_index].status = "resolved"
-            logger.info(f"Marked action {action_index} as resolved in channel {channel_id}")
+            action_item = self.action_items[channel_id][action_index]
+            if action_item.status == "unresolved":
+                self.stats[channel_id].actions_open -= 1
+                self.stats[channel_id].actions_resolved += 1
+            action_item.status = "resolved"
+            self._touch(channel_id)
+            self._publish(channel_id, "action_resolved", action_item.to_event)
+            logger.info("Marked action %d as resolved in channel %s", action_index, channel_id,
+                        extra=log_extra(channel_id, "action_resolved"))
+            return True
+        return False
+    
+    def get_digest(self, channel_id: str) -> Dict:
+        """Aggregated view of a channel (see ChatStats.digest), cached until
+        the channel changes or the hour rolls over
+        """
+        now = datetime.now()
+        key = (self.get_version(channel_id), now.toordinal(), now.hour)
+        cached = self._digests.get(channel_id)
+        if cached and cached[0] == key:
+            return cached[1]
+        
+        stats = self.stats.get(channel_id) or ChatStats(channel_id)
+        digest = stats.digest(now)
+        self._digests[channel_id] = (key, digest)
+        return digest
+    
+    def save_stats(self, path: str):
+        """Snapshot the per-channel aggregates (see chat_stats.save_snapshot)"""
+        save_snapshot(self.stats, path, self.imported_files)
+    
+    def load_stats(self, path: str) -> int:
+        """Restore aggregates saved by ``save_stats``; returns the number of channels.
+        
+        Load before importing history: files listed in ``imported_files``
+        afterwards are already counted and should be imported with
+        ``count_stats=False``. Action items themselves are not persisted, so
+        open/resolved counts are taken from the items currently held rather
+        than from the snapshot.
+        """
+        stats, imported_files = load_snapshot(path)
+        self.stats.update(stats)
+        self.imported_files |= imported_files
+        for channel_id, stats in self.stats.items():
+            items = self.action_items.get(channel_id, [])
+            stats.actions_open = sum(1 for item in items if item.status == "unresolved")
+            stats.actions_resolved = len(items) - stats.actions_open
+        self._digests.clear()
+        self._snapshot_state = sum(self.versions.values())
+        logger.info("Loaded stats for %d channels from %s", len(self.stats), path)
+        return len(self.stats)
+    
+    async def save_stats_periodically(self, path: str, interval: float = 60.0):
+        """Background task: snapshot aggregates every ``interval`` seconds when changed"""
+        saved = self._snapshot_state  # what was loaded needs no rewrite
+        while True:
+            await asyncio.sleep(interval)
+            state = sum(self.versions.values())
+            if state == saved:
+                continue
+            try:
+                self.save_stats(path)
+                saved = state
+            except OSError as e:
+                logger.warning("Could not save stats snapshot to %s: %s", path, e)
     
     def get_recent_messages(self, channel_id: str, count: int = 10) -> List[Message]:
         """Get recent messages from a channel"""
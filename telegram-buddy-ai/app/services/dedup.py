@@ -0,0 +1,131 @@
+# app/services/dedup.py
+"""
+Ingest-time suppression of repeated messages (forwarded announcements, bot
+spam, copy-pastes).
+
+Each chat gets a DuplicateDetector holding a sliding window of recently
+stored messages. A new message is a duplicate if its normalized text hashes
+the same as a window entry. Long or forwarded messages are also duplicates if
+their word-bigram set is near-identical to one with the same @mentions
+(MinHash bottom-k signature for lookup, Jaccard similarity to confirm);
+short messages that differ in a word ("by monday" / "by friday") are kept.
+Shingles per message and candidates per lookup are capped, so the cost per
+message is constant regardless of window size or message length.
+"""
+import re
+import string
+from collections import deque
+from typing import Dict, FrozenSet, List, Optional
+
+from ..models.message import Message
+
+_PUNCTUATION = str.maketrans(string.punctuation, " " * len(string.punctuation))
+_MENTION = re.compile(r"@\w+")
+
+# Shorter texts ("ok", "+1", "lunch?") mean different things in different
+# places, so only longer messages and forwards are collapsed
+MIN_CHARS = 16
+# Near-duplicate matching only for texts at least this long (or forwards)
+MIN_NEAR_WORDS = 20
+MAX_CHARS = 4096
+MAX_SHINGLES = 256
+SIGNATURE_SIZE = 8
+
+
+class _Entry:
+    def __init__(self, message: Message, exact_key: int, signature: List[int], shingles: FrozenSet[int],
+                 mentions: FrozenSet[str]):
+        self.message = message
+        self.exact_key = exact_key
+        self.signature = signature
+        self.shingles = shingles
+        self.mentions = mentions
+
+
+def _words(text: str) -> List[str]:
+    """Lowercased words with ASCII punctuation and extra whitespace dropped"""
+    return text.lower().translate(_PUNCTUATION).split()
+
+
+def _shingles(words: List[str]) -> FrozenSet[int]:
+    """Hashed word bigrams of (at most) the first MAX_SHINGLES + 1 words"""
+    words = words[:MAX_SHINGLES + 1]
+    return frozenset(map(hash, zip(words, words[1:])))
+
+
+class DuplicateDetector:
+    def __init__(self, window: int = 100, threshold: float = 0.9):
+        self.window = window
+        self.threshold = threshold
+        self._entries: deque = deque()
+        self._exact: Dict[int, _Entry] = {}
+        self._minhash: Dict[int, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def check(self, message: Message) -> Optional[Message]:
+        """Return the stored message ``message`` repeats, or remember it and return None"""
+        # Only a bounded prefix is examined, so long messages cost the same
+        text = message.content[:MAX_CHARS]
+        words = _words(text)
+        normalized = " ".join(words)
+        forwarded = message.metadata.get("forwarded")
+        if len(normalized) < MIN_CHARS and not forwarded:
+            return None
+
+        exact_key = hash(normalized)
+        entry = self._exact.get(exact_key)
+        if entry is not None:
+            return entry.message
+
+        signature: List[int] = []
+        shingles: FrozenSet[int] = frozenset()
+        mentions: FrozenSet[str] = frozenset()
+        if len(words) >= MIN_NEAR_WORDS or (forwarded and len(words) > 1):
+            shingles = _shingles(words)
+            signature = sorted(shingles)[:SIGNATURE_SIZE]
+            mentions = frozenset(mention.lower() for mention in _MENTION.findall(text))
+            entry = self._near_duplicate(signature, shingles, mentions)
+            if entry is not None:
+                return entry.message
+
+        self._remember(_Entry(message, exact_key, signature, shingles, mentions))
+        return None
+
+    def _near_duplicate(self, signature: List[int], shingles: FrozenSet[int],
+                        mentions: FrozenSet[str]) -> Optional[_Entry]:
+        # Similar sets very likely share at least one of their smallest hashes
+        checked = set()
+        size = len(shingles)
+        for value in signature:
+            entry = self._minhash.get(value)
+            if entry is None or entry in checked:
+                continue
+            checked.add(entry)
+            # Same text addressed to someone else is a different request
+            if entry.mentions != mentions:
+                continue
+            other_size = len(entry.shingles)
+            # Jaccard can't reach the threshold if the sizes differ too much
+            if min(size, other_size) < self.threshold * max(size, other_size):
+                continue
+            common = len(shingles & entry.shingles)
+            if common >= self.threshold * (size + other_size - common):
+                return entry
+        return None
+
+    def _remember(self, entry: _Entry):
+        self._entries.append(entry)
+        self._exact[entry.exact_key] = entry
+        for value in entry.signature:
+            self._minhash[value] = entry
+
+        if len(self._entries) > self.window:
+            old = self._entries.popleft()
+            # Only drop index slots a newer entry hasn't taken over
+            if self._exact.get(old.exact_key) is old:
+                del self._exact[old.exact_key]
+            for value in old.signature:
+                if self._minhash.get(value) is old:
+                    del self._minhash[value]
@@ -0,0 +1,116 @@
+# app/services/event_bus.py
+"""
+Per-project publish/subscribe for pushing live updates to the web UI.
+
+ContextManager publishes message/action events; each open dashboard holds a
+Subscription with a bounded queue of pre-encoded Server-Sent Events frames.
+Events are serialized once per publish, not once per subscriber. A
+subscriber whose queue fills up is disconnected rather than slowing down
+publishing or buffering without bound; the browser's EventSource reconnects
+and refetches state.
+"""
+import asyncio
+import json
+import logging
+import threading
+from typing import Dict, Optional, Set
+
+from ..logging_config import log_extra
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    def __init__(self, project_id: str, loop: asyncio.AbstractEventLoop, max_queue: int):
+        self.project_id = project_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue + 1)  # +1 for the close frame
+        self.max_queue = max_queue
+        self.closed = False
+
+    def _deliver(self, frame: bytes):
+        """Runs on the subscriber's event loop"""
+        if self.closed:
+            return
+        if self.queue.qsize() >= self.max_queue:
+            logger.warning("Disconnecting slow event subscriber for project %s", self.project_id,
+                           extra=log_extra(self.project_id, "subscriber_dropped"))
+            self.close(b"event: overflow\ndata: {}\n\n")
+            return
+        self.queue.put_nowait(frame)
+
+    def close(self, frame: Optional[bytes] = None):
+        """Drop anything pending and end the stream after ``frame``"""
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        if frame:
+            self.queue.put_nowait(frame)
+        self.queue.put_nowait(None)
+
+
+class EventBus:
+    def __init__(self, max_queue: int = 256):
+        self.max_queue = max_queue
+        self.subscribers: Dict[str, Set[Subscription]] = {}
+        self._event_id = 0
+        # publish() may run on other threads than the loops that (un)subscribe
+        self._lock = threading.Lock()
+
+    def subscribe(self, project_id: str) -> Subscription:
+        """Register a subscriber; must be called from the event loop that will consume it"""
+        subscription = Subscription(project_id, asyncio.get_running_loop(), self.max_queue)
+        with self._lock:
+            self.subscribers.setdefault(project_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscribers = self.subscribers.get(subscription.project_id)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.project_id]
+
+    def has_subscribers(self, project_id: str) -> bool:
+        return bool(self.subscribers.get(project_id))
+
+    def publish(self, project_id: str, event: str, data: Dict):
+        """Send an event to every subscriber of ``project_id``; safe from any thread"""
+        with self._lock:
+            subscribers = list(self.subscribers.get(project_id, ()))
+            if not subscribers:
+                return
+            self._event_id += 1
+            event_id = self._event_id
+
+        frame = f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        for subscription in subscribers:
+            if subscription.loop is running:
+                subscription._deliver(frame)
+            else:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, frame)
+
+    async def stream(self, subscription: Subscription, heartbeat: float = 15.0):
+        """Async iterator of SSE frames for a StreamingResponse"""
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            # Client went away or was dropped as too slow
+            subscription.closed = True
+            self.unsubscribe(subscription)
@@ -0,0 +1,298 @@
+# app/services/history_import.py
+"""
+Bulk import of chat history.
+
+Supports Telegram Desktop exports (``result.json``, single chat or full
+account export) and NDJSON (one message object per line). Input is parsed
+incrementally from text chunks, so multi-GB exports never have to fit in
+memory, and messages are handed to ContextManager in batches.
+"""
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..models.message import Message
+from .context_manager import ContextManager
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("json", "ndjson")
+
+_MESSAGES_KEY = re.compile(r'"messages"\s*:\s*\[')
+_CHAT_ID = re.compile(r'"id"\s*:\s*(-?\d+)')
+_CHAT_TYPE = re.compile(r'"type"\s*:\s*"([a-z_]+)"')
+_CHAT_NAME = re.compile(r'"name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+# Characters of header text kept while looking for the next "messages" array
+_MAX_HEADER = 1 << 20
+
+# A decode error this close to the end of the buffer may just be an element
+# cut off mid-token (``tru``, ``1.``, ``"\u12``) by the chunk boundary
+_TRUNCATION_SLACK = 64
+
+# Chat info attached to every record: (chat id as the Bot API sees it, chat title)
+ChatInfo = Tuple[Optional[str], Optional[str]]
+
+
+class HistoryImportError(ValueError):
+    """Malformed import data"""
+
+
+class ExportParser:
+    """Push parser: ``feed()`` text chunks, get back raw message dicts.
+
+    ``json`` mode walks a Telegram Desktop export and yields every element
+    of each ``"messages"`` array together with the owning chat; ``ndjson``
+    mode yields one object per line.
+    """
+    def __init__(self, fmt: str = "json"):
+        if fmt not in FORMATS:
+            raise HistoryImportError(f"Unsupported format '{fmt}', expected one of {FORMATS}")
+        self.fmt = fmt
+        self._buffer = ""
+        self._in_array = False
+        self._chat: ChatInfo = (None, None)
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text: str) -> Iterator[Tuple[ChatInfo, Dict]]:
+        self._buffer += text
+        if self.fmt == "ndjson":
+            yield from self._feed_ndjson(final=False)
+        else:
+            yield from self._feed_json()
+
+    def close(self) -> Iterator[Tuple[ChatInfo, Dict]]:
+        """Flush whatever is left; raises on truncated input"""
+        if self.fmt == "ndjson":
+            yield from self._feed_ndjson(final=True)
+        elif self._in_array:
+            raise HistoryImportError("Unexpected end of input inside a messages array")
+
+    def _feed_ndjson(self, final: bool) -> Iterator[Tuple[ChatInfo, Dict]]:
+        lines = self._buffer.split("\n")
+        self._buffer = "" if final else lines.pop()
+        for line in lines:
+            line = line.strip()
+            if line:
+                try:
+                    yield self._chat, json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise HistoryImportError(f"Invalid NDJSON line: {e}") from e
+
+    def _feed_json(self) -> Iterator[Tuple[ChatInfo, Dict]]:
+        buffer = self._buffer
+        pos = 0
+        length = len(buffer)
+
+        while True:
+            if not self._in_array:
+                match = _MESSAGES_KEY.search(buffer, pos)
+                if not match:
+                    # Keep a tail in case the key straddles two chunks
+                    header = buffer[pos:]
+                    self._buffer = header[-_MAX_HEADER:]
+                    return
+                self._chat = _chat_info(buffer[pos:match.start()])
+                self._in_array = True
+                pos = match.end()
+                continue
+
+            # Skip separators between array elements
+            while pos < length and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= length:
+                break
+            if buffer[pos] == "]":
+                self._in_array = False
+                pos += 1
+                continue
+
+            try:
+                record, end = self._decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if _truncated(e, length):
+                    break  # element split across chunks; wait for more
+                raise HistoryImportError(f"Invalid JSON in messages array: {e}") from e
+            pos = end
+            if isinstance(record, dict):
+                yield self._chat, record
+
+        self._buffer = buffer[pos:]
+
+
+def _truncated(error: json.JSONDecodeError, length: int) -> bool:
+    """Whether a decode error can be explained by the input ending early"""
+    return error.msg.startswith("Unterminated string") or error.pos >= length - _TRUNCATION_SLACK
+
+
+def _chat_info(header: str) -> ChatInfo:
+    """Chat id/title from the fields preceding a "messages" array"""
+    ids = _CHAT_ID.findall(header)
+    if not ids:
+        return None, None
+    types = _CHAT_TYPE.findall(header)
+    names = _CHAT_NAME.findall(header)
+    name = json.loads(f'"{names[-1]}"') if names else None
+    return _bot_api_chat_id(int(ids[-1]), types[-1] if types else ""), name
+
+
+def _bot_api_chat_id(export_id: int, chat_type: str) -> str:
+    """Telegram Desktop exports bare ids; the Bot API prefixes groups"""
+    if chat_type.endswith("supergroup") or chat_type.endswith("channel"):
+        return f"-100{export_id}"
+    if chat_type == "private_group":
+        return f"-{export_id}"
+    return str(export_id)
+
+
+def _flatten_text(text) -> str:
+    """Export text is either a string or a list of strings/entity dicts"""
+    if isinstance(text, str):
+        return text
+    if isinstance(text, list):
+        return "".join(part if isinstance(part, str) else part.get("text", "") for part in text)
+    return ""
+
+
+def to_message(chat: ChatInfo, record: Dict, channel_id: Optional[str] = None) -> Optional[Message]:
+    """Map an export or NDJSON record to a Message; None for service/empty messages"""
+    chat_id, chat_title = chat
+
+    # Already in our own Message shape (NDJSON dumps of Message.model_dump())
+    if "content" in record and "message_id" in record:
+        if channel_id:
+            record = dict(record, channel_id=channel_id)
+        return Message.model_validate(record)
+
+    if record.get("type", "message") != "message":
+        return None
+    content = _flatten_text(record.get("text"))
+    if not content:
+        return None
+
+    if "date_unixtime" in record:
+        timestamp = datetime.fromtimestamp(int(record["date_unixtime"]))
+    elif "date" in record:
+        timestamp = datetime.fromisoformat(record["date"])
+    else:
+        return None
+
+    user_id = str(record.get("from_id") or "user")
+    if user_id.startswith("user"):
+        user_id = user_id[4:]
+    metadata = {
+        "username": record.get("from") or "Unknown",
+        "first_name": record.get("from") or "Unknown",
+        "chat_title": chat_title or "Imported Chat",
+        "imported": True,
+    }
+    reply_to = record.get("reply_to_message_id")
+
+    # Field types are fixed by the mapping above; skip pydantic validation for speed
+    return Message.model_construct(
+        content=content,
+        timestamp=timestamp,
+        source="import",
+        channel_id=channel_id or chat_id or "default",
+        user_id=user_id,
+        message_id=str(record.get("id", "")),
+        reply_to_id=str(reply_to) if reply_to is not None else None,
+        metadata=metadata,
+    )
+
+
+class HistoryImporter:
+    """Streams records from an ExportParser into a ContextManager in batches"""
+    def __init__(self, context_manager: ContextManager, fmt: str = "json",
+                 channel_id: Optional[str] = None, batch_size: int = 5000, count_stats: bool = True):
+        self.context_manager = context_manager
+        self.parser = ExportParser(fmt)
+        self.channel_id = channel_id
+        self.batch_size = batch_size
+        self.count_stats = count_stats
+
+        self._batch: List[Message] = []
+        self._started = time.perf_counter()
+        self.messages = 0
+        self.skipped = 0
+        self.action_items = 0
+        self.channels = set()
+        self._repeats_before = sum(context_manager.duplicate_totals.values())
+
+    def feed(self, text: str):
+        self._consume(self.parser.feed(text))
+
+    def finish(self) -> Dict:
+        self._consume(self.parser.close())
+        self._flush()
+        elapsed = time.perf_counter() - self._started
+        result = {
+            "messages_imported": self.messages,
+            "records_skipped": self.skipped,
+            "repeats_collapsed": sum(self.context_manager.duplicate_totals.values()) - self._repeats_before,
+            "action_items_found": self.action_items,
+            "channels": sorted(self.channels),
+            "elapsed_seconds": round(elapsed, 3),
+            "messages_per_minute": int(self.messages / elapsed * 60) if elapsed else None,
+        }
+        logger.info("History import finished: %d messages, %d skipped, %.1fs",
+                    self.messages, self.skipped, elapsed)
+        return result
+
+    def _consume(self, records: Iterable[Tuple[ChatInfo, Dict]]):
+        for chat, record in records:
+            try:
+                message = to_message(chat, record, self.channel_id)
+            except (ValueError, TypeError) as e:
+                logger.debug("Skipping unparseable record: %s", e)
+                message = None
+            if message is None:
+                self.skipped += 1
+                continue
+            self._batch.append(message)
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        self.action_items += self.context_manager.add_messages(self._batch, self.count_stats)
+        self.messages += len(self._batch)
+        self.channels.update(message.channel_id for message in self._batch)
+        self._batch = []
+
+
+def import_file(context_manager: ContextManager, path: str, fmt: Optional[str] = None,
+                channel_id: Optional[str] = None, chunk_size: int = 1 << 20,
+                count_stats: bool = True) -> Dict:
+    """Import a file from disk, reading it in ``chunk_size`` pieces.
+    
+    With ``count_stats=False`` the messages are stored but left out of the
+    chat aggregates, e.g. because a loaded stats snapshot already counts them.
+    """
+    importer = HistoryImporter(context_manager, fmt or guess_format(path), channel_id,
+                               count_stats=count_stats)
+    with open(path, encoding="utf-8") as f:
+        while True:
+            try:
+                chunk = f.read(chunk_size)
+            except UnicodeDecodeError as e:
+                raise HistoryImportError(f"{path} is not valid UTF-8: {e}") from e
+            if not chunk:
+                break
+            importer.feed(chunk)
+    return importer.finish()
+
+
+def file_key(path: str) -> str:
+    """Identifies one version of an export file: path, size and mtime"""
+    stat = os.stat(path)
+    return f"{os.path.abspath(path)}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+def guess_format(path: str) -> str:
+    return "ndjson" if path.endswith((".ndjson", ".jsonl")) else "json"
@@ -0,0 +1,110 @@
+# app/services/reply_graph.py
+"""
+Per-channel reply graph: parent/children adjacency keyed by message_id.
+
+Lets the bot answer a mention inside a reply chain with just that thread
+instead of the channel's last N messages. Thread lookup costs O(thread size).
+The graph keeps more messages than the 100-message context window so older
+threads stay reachable; the oldest nodes are evicted first.
+"""
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from ..models.message import Message
+
+
+class ReplyGraph:
+    def __init__(self, max_nodes: int = 1000):
+        self.max_nodes = max_nodes
+        self._messages: "OrderedDict[str, Optional[Message]]" = OrderedDict()
+        self._parent: Dict[str, str] = {}
+        self._children: Dict[str, List[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def add(self, message: Message):
+        """Index a message (and its reply edge, if any)"""
+        self._add_node(message.message_id, message, message.reply_to_id)
+        self._evict()
+
+    def add_many(self, messages: Iterable[Message]):
+        """Bulk version of ``add``: evicts once at the end"""
+        for message in messages:
+            self._add_node(message.message_id, message, message.reply_to_id)
+        self._evict()
+
+    def link(self, child_id: str, parent_id: str):
+        """Record a reply whose message we don't store (e.g. the bot's own answers)"""
+        self._add_node(child_id, None, parent_id)
+        self._evict()
+
+    def parent_of(self, message_id: str) -> Optional[str]:
+        return self._parent.get(message_id)
+
+    def children_of(self, message_id: str) -> List[str]:
+        return list(self._children.get(message_id, ()))
+
+    def thread(self, message_id: str, limit: int = 50) -> List[Message]:
+        """Messages in the thread containing ``message_id``, oldest first.
+        
+        Always includes the chain from the root down to ``message_id`` (the
+        closest ancestors if it is longer than ``limit``), then fills the
+        remaining slots with the newest other messages in the thread.
+        """
+        path = [message_id]
+        seen = {message_id}
+        while path[-1] in self._parent:
+            parent = self._parent[path[-1]]
+            if parent in seen:  # defensive: ids are not guaranteed unique
+                break
+            seen.add(parent)
+            path.append(parent)
+
+        selected = [self._messages[node] for node in path if self._messages.get(node) is not None][:limit]
+
+        # Breadth-first from the root over the rest of the thread
+        others = []
+        queue = [path[-1]]
+        visited = {path[-1]}
+        for node in queue:
+            message = self._messages.get(node)
+            if message is not None and node not in seen:
+                others.append(message)
+            for child in self._children.get(node, ()):
+                if child not in visited:
+                    visited.add(child)
+                    queue.append(child)
+
+        if len(selected) < limit and others:
+            others.sort(key=lambda message: message.timestamp)
+            selected += others[-(limit - len(selected)):]
+
+        selected.sort(key=lambda message: message.timestamp)
+        return selected
+
+    def _add_node(self, message_id: str, message: Optional[Message], parent_id: Optional[str]):
+        if message_id in self._messages:
+            # Keep an existing message if this is only a link
+            if message is None:
+                message = self._messages[message_id]
+            self._messages.move_to_end(message_id)
+        self._messages[message_id] = message
+
+        if parent_id and parent_id != message_id and message_id not in self._parent:
+            self._parent[message_id] = parent_id
+            self._children.setdefault(parent_id, []).append(message_id)
+
+    def _evict(self):
+        while len(self._messages) > self.max_nodes:
+            message_id, _ = self._messages.popitem(last=False)
+            parent_id = self._parent.pop(message_id, None)
+            if parent_id is not None:
+                siblings = self._children.get(parent_id)
+                if siblings:
+                    siblings.remove(message_id)
+                    if not siblings:
+                        del self._children[parent_id]
+            # Replies to the evicted message become roots of their own threads
+            for child_id in self._children.pop(message_id, ()):
+                self._parent.pop(child_id, None)
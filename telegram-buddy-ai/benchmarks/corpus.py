@@ -0,0 +1,93 @@
+# benchmarks/corpus.py
+"""
+Synthetic developer-chat corpus for benchmarks and load tests.
+
+Everything is generated from a seeded RNG so runs are reproducible and need
+no network or recorded data.
+"""
+import random
+from datetime import datetime, timedelta
+from typing import Iterator, List, Optional
+
+from app.models.message import Message
+
+USERS = ["alice", "bob", "carol", "dave", "erin", "frank", "grace", "heidi"]
+
+COMPONENTS = [
+    "API integration", "auth service", "rate limiter", "billing webhook",
+    "user dashboard", "database migration", "CI pipeline", "search indexer",
+]
+
+TEMPLATES = [
+    # chatter
+    "morning all",
+    "deployed {component} to staging, looks fine so far",
+    "lunch?",
+    "the {component} tests are green again",
+    "pushed a refactor of the {component}, nothing functional",
+    "anyone seen the flaky test in {component}",
+    # questions
+    "what's the status of the {component}?",
+    "how do we roll back the {component} if this breaks?",
+    "who owns the {component} now?",
+    # action items
+    "we need to finish the {component} by friday",
+    "@{user} can you review the PR for the {component}?",
+    "todo: add metrics to the {component}",
+    "the {component} is failing in prod, this is urgent, please look asap",
+    "remember to update the docs for the {component}",
+    "we should split the {component} into two services",
+]
+
+
+def generate_texts(count: int, seed: int = 42) -> List[str]:
+    """Generate ``count`` chat message texts.
+
+    Each text ends in a reference unique to (seed, index), so ContextManager
+    stores every one instead of collapsing repeats of the same template.
+    """
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        template = rng.choice(TEMPLATES)
+        text = template.format(component=rng.choice(COMPONENTS), user=rng.choice(USERS))
+        # Occasionally pad with a longer explanation like real chat
+        if rng.random() < 0.2:
+            text += " " + " ".join(rng.choice(COMPONENTS).lower() for _ in range(rng.randint(5, 30)))
+        texts.append(f"{text} #{seed}.{i}")
+    return texts
+
+
+def iter_messages(count: int, channel_ids: Optional[List[str]] = None, seed: int = 42,
+                  start: Optional[datetime] = None, reply_rate: float = 0.0) -> Iterator[Message]:
+    """Yield ``count`` Message objects spread across ``channel_ids``.
+
+    Timestamps are one second apart and end near ``start`` (default: now) so
+    they fall inside ContextManager's default lookback window. ``reply_rate``
+    of the messages reply to one of the previous 20.
+    """
+    rng = random.Random(seed)
+    channel_ids = channel_ids or ["default"]
+    start = start or datetime.now() - timedelta(seconds=count)
+
+    for i, text in enumerate(generate_texts(count, seed)):
+        user = rng.choice(USERS)
+        reply_to = None
+        if reply_rate and i and rng.random() < reply_rate:
+            reply_to = str(rng.randint(max(1, i - 19), i))
+        yield Message(
+            content=text,
+            timestamp=start + timedelta(seconds=i),
+            source="synthetic",
+            channel_id=rng.choice(channel_ids),
+            user_id=user,
+            message_id=str(i + 1),
+            reply_to_id=reply_to,
+            metadata={"username": user, "first_name": user.title(), "chat_title": "Synthetic Chat"}
+        )
+
+
+def generate_messages(count: int, channel_ids: Optional[List[str]] = None, seed: int = 42,
+                      reply_rate: float = 0.0) -> List[Message]:
+    """Materialized version of ``iter_messages``"""
+    return list(iter_messages(count, channel_ids, seed, reply_rate=reply_rate))
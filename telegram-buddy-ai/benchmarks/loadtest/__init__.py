@@ -0,0 +1 @@
+# benchmarks/loadtest - end-to-end load harness, see __main__.py
@@ -0,0 +1,233 @@
+# benchmarks/loadtest/__main__.py
+"""
+End-to-end load harness.
+
+Starts a fake Telegram Bot API and a fake OpenAI-compatible endpoint, runs
+the real bot (telegram_runner.py) against them in a subprocess, replays
+recorded or synthetic traffic and reports throughput, reply latency
+percentiles and dropped/429 counts.
+
+Usage (from telegram-buddy-ai/):
+    python -m benchmarks.loadtest --synthetic 2000 --groups 20 --rate 50
+    python -m benchmarks.loadtest --updates data/updates.ndjson --speed 1      # real time
+    python -m benchmarks.loadtest --synthetic 5000 --llm-latency 1.5 --tg-429-rate 0.05
+    python -m benchmarks.loadtest --serve-only     # just the fakes, run the bot yourself
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+import uvicorn
+
+from .fake_llm import FakeLLM
+from .fake_telegram import FakeTelegramAPI
+from .traffic import activation_updates, drive, expects_reply, load_recorded, synthetic_updates
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FAKE_TOKEN = "123456:loadtest"
+
+
+class _Server(uvicorn.Server):
+    """uvicorn server that leaves signal handling to us"""
+    def install_signal_handlers(self):
+        pass
+
+
+async def _start_server(app, port: int) -> _Server:
+    server = _Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    server.task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _bot_env(telegram_port: int, llm_port: int) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "TELEGRAM_BOT_TOKEN": FAKE_TOKEN,
+        "TELEGRAM_API_BASE_URL": f"http://127.0.0.1:{telegram_port}/bot",
+        "STRANDS_MODEL_PROVIDER": "azure",
+        "AZURE_OPENAI_ENDPOINT": f"http://127.0.0.1:{llm_port}",
+        "AZURE_OPENAI_API_KEY": "loadtest",
+        "AZURE_OPENAI_API_VERSION": "2024-02-01",
+        "AZURE_OPENAI_DEPLOYMENT_NAME": "loadtest",
+        "LOG_PROFILE": env.get("LOG_PROFILE", "production"),
+    })
+    env.pop("TELEGRAM_RECORD_UPDATES", None)
+    return env
+
+
+async def run(args) -> Dict:
+    telegram = FakeTelegramAPI(send_latency=args.tg_latency, rate_limit_rate=args.tg_429_rate, seed=args.seed)
+    llm = FakeLLM(latency=args.llm_latency, jitter=args.llm_jitter, error_rate=args.llm_error_rate,
+                  rate_limit_rate=args.llm_429_rate, seed=args.seed)
+
+    telegram_port = args.telegram_port or _free_port()
+    llm_port = args.llm_port or _free_port()
+    servers = [await _start_server(telegram.app, telegram_port), await _start_server(llm.app, llm_port)]
+    print(f"Fake Telegram API: http://127.0.0.1:{telegram_port}/bot")
+    print(f"Fake LLM endpoint: http://127.0.0.1:{llm_port}")
+
+    bot = None
+    try:
+        if args.serve_only:
+            print("Serving until interrupted (TELEGRAM_API_BASE_URL / AZURE_OPENAI_ENDPOINT above)")
+            await asyncio.Event().wait()
+
+        if args.updates:
+            updates = load_recorded(args.updates)
+        else:
+            updates = synthetic_updates(args.synthetic, groups=args.groups,
+                                        mention_rate=args.mention_rate, reply_rate=args.reply_rate,
+                                        seed=args.seed)
+        if not args.no_activate:
+            updates = activation_updates(updates) + updates
+
+        log = open(args.bot_log, "w") if args.bot_log else subprocess.DEVNULL
+        bot = subprocess.Popen([sys.executable, "telegram_runner.py"], cwd=PROJECT_DIR,
+                               env=_bot_env(telegram_port, llm_port), stdout=log, stderr=subprocess.STDOUT)
+
+        # Wait for the bot's first getUpdates before sending anything
+        deadline = time.monotonic() + args.startup_timeout
+        while not telegram.polling.is_set():
+            if bot.poll() is not None:
+                raise RuntimeError(f"bot exited with code {bot.returncode} during startup")
+            if time.monotonic() > deadline:
+                raise RuntimeError("bot did not start polling in time")
+            await asyncio.sleep(0.05)
+
+        print(f"Replaying {len(updates)} updates...")
+        start = time.perf_counter()
+        send_elapsed = await drive(telegram.push, updates, rate=args.rate, speed=args.speed)
+
+        # Drain: wait for the backlog to clear and expected replies to arrive
+        expected = [
+            (update["message"]["chat"]["id"], update["message"]["message_id"])
+            for update, _ in updates if expects_reply(update)
+        ]
+        drained_at = None
+        deadline = time.monotonic() + args.drain_timeout
+        while time.monotonic() < deadline and bot.poll() is None:
+            if telegram.backlog == 0 and drained_at is None:
+                drained_at = time.perf_counter()
+            if drained_at and all(key in telegram.replies for key in expected):
+                break
+            if telegram.backlog:
+                drained_at = None
+            await asyncio.sleep(0.05)
+        # The bot confirms updates before handling them, so the run ends at
+        # whichever comes last: empty backlog or the last reply
+        finished = max([drained_at or time.perf_counter(), *telegram.replies.values()])
+        processed_elapsed = finished - start
+
+        latencies = telegram.latencies()
+        answered = sum(1 for key in expected if key in telegram.replies)
+        return {
+            "updates_sent": len(updates),
+            "send_seconds": round(send_elapsed, 3),
+            "updates_delivered": telegram.delivered,
+            "updates_undelivered": telegram.backlog,
+            "processing_seconds": round(processed_elapsed, 3),
+            "throughput_updates_per_sec": round(telegram.delivered / processed_elapsed, 2) if processed_elapsed else None,
+            "replies_sent": telegram.sent_messages,
+            "expected_replies": len(expected),
+            "dropped_replies": len(expected) - answered,
+            "latency_p50_ms": _ms(percentile(latencies, 50)),
+            "latency_p95_ms": _ms(percentile(latencies, 95)),
+            "latency_p99_ms": _ms(percentile(latencies, 99)),
+            "latency_max_ms": _ms(max(latencies) if latencies else None),
+            "telegram_429": telegram.rate_limited,
+            "llm_requests": llm.requests,
+            "llm_errors": llm.errors,
+            "llm_429": llm.rate_limited,
+            "bot_exit_code": bot.poll(),
+        }
+    finally:
+        if bot and bot.poll() is None:
+            bot.terminate()
+            try:
+                bot.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                bot.kill()
+        for server in servers:
+            server.should_exit = True
+        await asyncio.gather(*(server.task for server in servers), return_exceptions=True)
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Telegram Buddy AI end-to-end load harness")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--updates", help="NDJSON file recorded with TELEGRAM_RECORD_UPDATES")
+    source.add_argument("--synthetic", type=int, default=500, help="number of synthetic updates")
+    parser.add_argument("--groups", type=int, default=5, help="synthetic: number of groups")
+    parser.add_argument("--mention-rate", type=float, default=0.05, help="synthetic: share of messages mentioning the bot")
+    parser.add_argument("--reply-rate", type=float, default=0.3, help="synthetic: share of messages that are replies")
+    parser.add_argument("--no-activate", action="store_true", help="don't send /start to each group first")
+
+    pacing = parser.add_mutually_exclusive_group()
+    pacing.add_argument("--rate", type=float, default=0.0, help="updates per second (0 = max speed)")
+    pacing.add_argument("--speed", type=float, help="replay original spacing; 1.0 = real time, 10 = 10x")
+
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="fake LLM latency in seconds")
+    parser.add_argument("--llm-jitter", type=float, default=0.05, help="fake LLM latency jitter in seconds")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="share of LLM calls failing with 500")
+    parser.add_argument("--llm-429-rate", type=float, default=0.0, help="share of LLM calls failing with 429")
+    parser.add_argument("--tg-latency", type=float, default=0.0, help="fake sendMessage latency in seconds")
+    parser.add_argument("--tg-429-rate", type=float, default=0.0, help="share of sendMessage calls answered with 429")
+
+    parser.add_argument("--startup-timeout", type=float, default=30.0)
+    parser.add_argument("--drain-timeout", type=float, default=60.0, help="max wait for the bot to catch up")
+    parser.add_argument("--telegram-port", type=int, default=0)
+    parser.add_argument("--llm-port", type=int, default=0)
+    parser.add_argument("--serve-only", action="store_true", help="only run the fake servers")
+    parser.add_argument("--bot-log", help="write the bot's output to this file")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    try:
+        report = asyncio.run(run(args))
+    except KeyboardInterrupt:
+        return 130
+    except RuntimeError as e:
+        print(f"Load test failed: {e}")
+        return 1
+
+    print()
+    for key, value in report.items():
+        print(f"{key:28} {value}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+# benchmarks/loadtest/fake_llm.py
+"""
+Local stand-in for an OpenAI-compatible chat completions endpoint.
+
+Accepts both Azure-style (/openai/deployments/<name>/chat/completions) and
+plain (/v1/chat/completions) paths. Latency and error injection are
+configurable so the harness can model a slow or flaky provider.
+"""
+import asyncio
+import random
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class FakeLLM:
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+        self.app = FastAPI(title="Fake LLM")
+        self.app.add_api_route("/{path:path}", self._completions, methods=["POST"])
+
+    async def _completions(self, path: str, request: Request):
+        if not path.endswith("chat/completions"):
+            return JSONResponse(status_code=404, content={"error": {"message": f"unknown path {path}"}})
+
+        self.requests += 1
+        body = await request.json()
+
+        delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        roll = self._rng.random()
+        if roll < self.error_rate:
+            self.errors += 1
+            return JSONResponse(status_code=500, content={"error": {"message": "injected failure", "type": "server_error"}})
+        if roll < self.error_rate + self.rate_limit_rate:
+            self.rate_limited += 1
+            return JSONResponse(status_code=429, headers={"retry-after": "1"},
+                                content={"error": {"message": "injected rate limit", "type": "rate_limit_error"}})
+
+        prompt = body["messages"][-1]["content"]
+        answer = "Fake LLM answer: the team is on track, see the recent messages for details."
+        return {
+            "id": f"chatcmpl-fake-{self.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or "fake",
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt.split()),
+                "completion_tokens": len(answer.split()),
+                "total_tokens": len(prompt.split()) + len(answer.split()),
+            },
+        }
@@ -0,0 +1,169 @@
+# benchmarks/loadtest/fake_telegram.py
+"""
+Local stand-in for the Telegram Bot API.
+
+Implements just enough of the API for python-telegram-bot's polling loop:
+getMe, deleteWebhook, getUpdates (long polling) and sendMessage. Updates are
+pushed in by the replay driver; replies are timestamped so the harness can
+measure update-to-reply latency.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+BOT_USER = {
+    "id": 1000001,
+    "is_bot": True,
+    "first_name": "Buddy",
+    "username": "BuddianBot",
+    "can_join_groups": True,
+    "can_read_all_group_messages": True,
+    "supports_inline_queries": False,
+}
+
+
+class FakeTelegramAPI:
+    def __init__(self, send_latency: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: int = 1, seed: int = 0):
+        self.send_latency = send_latency
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+
+        self._pending: deque = deque()  # (update_id, update dict)
+        self._available = asyncio.Event()
+        self._next_update_id = 1
+        self._next_message_id = 1
+
+        # Bookkeeping for the report
+        self.pushed_at: Dict[Tuple[int, int], float] = {}   # (chat_id, message_id) -> push time
+        self.replies: Dict[Tuple[int, int], float] = {}     # (chat_id, message_id) -> first reply time
+        self.sent_messages = 0
+        self.rate_limited = 0
+        self.delivered = 0  # highest update_id handed out by getUpdates
+        self.polling = asyncio.Event()
+
+        self.app = FastAPI(title="Fake Telegram Bot API")
+        self.app.add_api_route("/bot{token}/{method}", self._dispatch, methods=["GET", "POST"])
+
+    # --- Driver side ---------------------------------------------------------
+
+    def push(self, update: Dict):
+        """Queue an update for the bot; ``update_id`` is reassigned"""
+        update = dict(update)
+        update["update_id"] = self._next_update_id
+        self._next_update_id += 1
+
+        message = update.get("message")
+        if message:
+            self.pushed_at[(message["chat"]["id"], message["message_id"])] = time.perf_counter()
+
+        self._pending.append((update["update_id"], update))
+        self._available.set()
+
+    @property
+    def backlog(self) -> int:
+        return len(self._pending)
+
+    # --- Bot API -------------------------------------------------------------
+
+    async def _dispatch(self, token: str, method: str, request: Request):
+        params = await _read_params(request)
+        handler = getattr(self, f"_api_{method}", None)
+        if handler is None:
+            return _ok(True)
+        return await handler(params)
+
+    async def _api_getMe(self, params: Dict):
+        return _ok(BOT_USER)
+
+    async def _api_deleteWebhook(self, params: Dict):
+        if str(params.get("drop_pending_updates", "")).lower() == "true":
+            self._pending.clear()
+        return _ok(True)
+
+    async def _api_getUpdates(self, params: Dict):
+        self.polling.set()
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        timeout = float(params.get("timeout") or 0)
+
+        # Anything below offset has been confirmed by the client
+        while self._pending and self._pending[0][0] < offset:
+            self._pending.popleft()
+
+        if not self._pending and timeout > 0:
+            self._available.clear()
+            try:
+                await asyncio.wait_for(self._available.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        batch = [update for _, update in list(self._pending)[:limit]]
+        # Unconfirmed updates are redelivered, so track the high-water mark
+        if batch:
+            self.delivered = max(self.delivered, batch[-1]["update_id"])
+        return _ok(batch)
+
+    async def _api_sendMessage(self, params: Dict):
+        if self.send_latency:
+            await asyncio.sleep(self.send_latency)
+
+        if self.rate_limit_rate and self._rng.random() < self.rate_limit_rate:
+            self.rate_limited += 1
+            return JSONResponse(status_code=429, content={
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {self.retry_after}",
+                "parameters": {"retry_after": self.retry_after},
+            })
+
+        chat_id = int(params["chat_id"])
+        reply_to = params.get("reply_to_message_id")
+        if reply_to is not None:
+            self.replies.setdefault((chat_id, int(reply_to)), time.perf_counter())
+        self.sent_messages += 1
+
+        message_id = self._next_message_id
+        self._next_message_id += 1
+        return _ok({
+            "message_id": 10_000_000 + message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "supergroup" if chat_id < 0 else "private"},
+            "from": BOT_USER,
+            "text": params.get("text", ""),
+        })
+
+    def latencies(self) -> List[float]:
+        """Update-to-first-reply latencies in seconds"""
+        return [
+            self.replies[key] - pushed
+            for key, pushed in self.pushed_at.items()
+            if key in self.replies
+        ]
+
+    def reply_time(self, chat_id: int, message_id: int) -> Optional[float]:
+        return self.replies.get((chat_id, message_id))
+
+
+def _ok(result) -> Dict:
+    return {"ok": True, "result": result}
+
+
+async def _read_params(request: Request) -> Dict:
+    """Bot API accepts query string, form data and JSON bodies"""
+    params = dict(request.query_params)
+    content_type = request.headers.get("content-type", "")
+    if "application/json" in content_type:
+        body = await request.json()
+        if isinstance(body, dict):
+            params.update(body)
+    elif request.method == "POST":
+        form = await request.form()
+        params.update({key: value for key, value in form.items() if isinstance(value, str)})
+    return params
@@ -0,0 +1,132 @@
+# benchmarks/loadtest/traffic.py
+"""
+Traffic sources for the load harness: recorded update files and synthetic
+multi-group chatter, plus the driver that feeds them at a given rate.
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+
+from ..corpus import USERS, generate_texts
+
+BOT_MENTION = "@BuddianBot"
+
+# (update, delay in seconds since the previous update in real time)
+TimedUpdate = Tuple[Dict, float]
+
+
+def load_recorded(path: str) -> List[TimedUpdate]:
+    """Read an NDJSON file written by UpdateRecorder"""
+    updates = []
+    previous = None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            update = json.loads(line)
+            received = update.pop("_received_at", None)
+            if received is None:
+                received = (update.get("message") or {}).get("date")
+            delay = max(0.0, received - previous) if received is not None and previous is not None else 0.0
+            previous = received if received is not None else previous
+            updates.append((update, delay))
+    return updates
+
+
+def synthetic_updates(count: int, groups: int = 5, mention_rate: float = 0.05,
+                      reply_rate: float = 0.3, seed: int = 42) -> List[TimedUpdate]:
+    """Interleaved traffic from ``groups`` supergroups with Poisson-ish spacing.
+
+    ``reply_rate`` of the messages reply to one of the last 20 in their group.
+    """
+    rng = random.Random(seed)
+    texts = generate_texts(count, seed)
+    chats = [{"id": -1001000000000 - i, "type": "supergroup", "title": f"Dev Group {i + 1}"} for i in range(groups)]
+    users = {name: {"id": 5000 + i, "is_bot": False, "first_name": name.title(), "username": name}
+             for i, name in enumerate(USERS)}
+    next_message_id = {chat["id"]: 1 for chat in chats}
+    now = int(time.time())
+
+    updates = []
+    for text in texts:
+        chat = rng.choice(chats)
+        if rng.random() < mention_rate:
+            text = f"{BOT_MENTION} {text}"
+        message_id = next_message_id[chat["id"]]
+        next_message_id[chat["id"]] += 1
+        message = {
+            "message_id": message_id,
+            "date": now,
+            "chat": chat,
+            "from": users[rng.choice(USERS)],
+            "text": text,
+        }
+        if message_id > 1 and rng.random() < reply_rate:
+            message["reply_to_message"] = {
+                "message_id": rng.randint(max(1, message_id - 20), message_id - 1),
+                "date": now,
+                "chat": chat,
+            }
+        updates.append(({"message": message}, rng.expovariate(1.0)))
+    return updates
+
+
+def activation_updates(updates: List[TimedUpdate]) -> List[TimedUpdate]:
+    """A /start per group seen in ``updates`` so the bot tracks those groups"""
+    activations = []
+    seen = set()
+    for update, _ in updates:
+        message = update.get("message")
+        if not message or message["chat"]["type"] not in ("group", "supergroup"):
+            continue
+        chat = message["chat"]
+        if chat["id"] in seen:
+            continue
+        seen.add(chat["id"])
+        activations.append(({
+            "message": {
+                "message_id": 0,
+                "date": int(time.time()),
+                "chat": chat,
+                "from": message.get("from") or {"id": 1, "is_bot": False, "first_name": "Admin"},
+                "text": "/start",
+                "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+            }
+        }, 0.0))
+    return activations
+
+
+def expects_reply(update: Dict) -> bool:
+    """Messages that always get an answer: bot mentions and /start"""
+    text = (update.get("message") or {}).get("text") or ""
+    return BOT_MENTION.lower() in text.lower() or text.startswith("/start")
+
+
+async def drive(push, updates: List[TimedUpdate], rate: float = 0.0,
+                speed: Optional[float] = None) -> float:
+    """Feed ``updates`` to ``push`` and return the elapsed time.
+
+    - ``speed`` set: keep the recorded/synthetic spacing, scaled by ``speed``
+      (1.0 = real time, 10.0 = ten times faster)
+    - ``rate`` > 0: fixed rate in updates per second
+    - otherwise: as fast as possible
+    """
+    start = time.perf_counter()
+    due = start
+    for update, delay in updates:
+        if speed:
+            due += delay / speed
+        elif rate > 0:
+            due += 1.0 / rate
+        wait = due - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        elif speed or rate > 0:
+            # Behind schedule: yield so the servers keep running
+            await asyncio.sleep(0)
+        push(update)
+    return time.perf_counter() - start
+
@@ -0,0 +1,300 @@
+# benchmarks/microbench.py
+"""
+Offline microbenchmarks for the core message pipeline.
+
+Usage (from telegram-buddy-ai/):
+    python -m benchmarks.microbench                  # run and compare to baseline
+    python -m benchmarks.microbench --save           # run and store as new baseline
+    python -m benchmarks.microbench -k context       # only benchmarks matching "context"
+
+No network access is needed: the LLM client used by BuddyAgent is replaced
+with a stub that returns a canned completion.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.agents.buddy_agent import BuddyAgent
+from app.models.context import QueryRequest
+from app.services.chat_stats import ChatStats
+from app.services.context_manager import ContextManager
+from app.services.dedup import DuplicateDetector
+from app.services.response_engine import ResponseEngine
+
+from .corpus import generate_messages
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+DEFAULT_BASELINE = os.path.join(RESULTS_DIR, "baseline.json")
+
+# name -> (setup, ops per run). ``setup()`` builds fresh state for each repeat
+# and returns the zero-argument callable that is timed.
+BENCHMARKS: Dict[str, Tuple[Callable[[], Callable[[], None]], int]] = {}
+
+
+def benchmark(name: str, ops: int = 1):
+    def decorator(setup: Callable[[], Callable[[], None]]):
+        BENCHMARKS[name] = (setup, ops)
+        return setup
+    return decorator
+
+
+class _StubCompletions:
+    """Mimics ``client.chat.completions`` and remembers the last prompt"""
+    def __init__(self):
+        self.last_prompt = None
+        self._response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="Stubbed answer from the benchmark client."))]
+        )
+
+    def create(self, model, messages, max_tokens):
+        self.last_prompt = messages[0]["content"]
+        return self._response
+
+
+def make_stub_agent() -> BuddyAgent:
+    """BuddyAgent wired to a stub client instead of Azure OpenAI"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent = BuddyAgent()
+    agent.model_provider = "azure"
+    agent.client = SimpleNamespace(chat=SimpleNamespace(completions=_StubCompletions()))
+    agent.deployment_name = "stub"
+    return agent
+
+
+def _prefilled_manager(history: int) -> ContextManager:
+    manager = ContextManager()
+    for message in generate_messages(history, seed=1):
+        manager.add_message(message)
+    return manager
+
+
+# --- ContextManager ---------------------------------------------------------
+
+def _add_message_bench(history: int):
+    def setup():
+        manager = _prefilled_manager(history)
+        batch = generate_messages(100, seed=2)
+
+        def run():
+            for message in batch:
+                manager.add_message(message)
+        return run
+    return setup
+
+
+def _get_context_bench(history: int):
+    def setup():
+        manager = _prefilled_manager(history)
+
+        def run():
+            for _ in range(100):
+                manager.get_context("default")
+        return run
+    return setup
+
+
+for _history in (0, 50, 100):
+    benchmark(f"context.add_message[history={_history}]", ops=100)(_add_message_bench(_history))
+    if _history:
+        benchmark(f"context.get_context[history={_history}]", ops=100)(_get_context_bench(_history))
+
+
+@benchmark("context.get_thread[history=1000,reply_rate=0.5]", ops=100)
+def _get_thread():
+    manager = ContextManager()
+    manager.add_messages(generate_messages(1000, seed=7, reply_rate=0.5))
+
+    def run():
+        for message_id in range(901, 1001):
+            manager.get_thread("default", str(message_id))
+    return run
+
+
+@benchmark("context.detect_action_items", ops=1000)
+def _detect_action_items():
+    manager = ContextManager()
+    messages = generate_messages(1000, seed=3)
+
+    def run():
+        for message in messages:
+            manager._detect_action_items(message)
+    return run
+
+
+@benchmark("dedup.check[window=100,unique]", ops=1000)
+def _dedup_check():
+    detector = DuplicateDetector()
+    messages = generate_messages(1000, seed=8)
+
+    def run():
+        for message in messages:
+            detector.check(message)
+    return run
+
+
+@benchmark("stats.add_message", ops=1000)
+def _stats_add_message():
+    stats = ChatStats("default")
+    messages = generate_messages(1000, seed=9)
+
+    def run():
+        for message in messages:
+            stats.add_message(message)
+    return run
+
+
+@benchmark("stats.digest[history=10000]", ops=100)
+def _stats_digest():
+    stats = ChatStats.from_messages(generate_messages(10000, seed=10))
+
+    def run():
+        for _ in range(100):
+            stats.digest()
+    return run
+
+
+# --- ResponseEngine ---------------------------------------------------------
+
+@benchmark("response_engine.should_respond", ops=1000)
+def _should_respond():
+    engine = ResponseEngine()
+    messages = generate_messages(1000, seed=4)
+
+    def run():
+        for message in messages:
+            engine.should_respond(message, False)
+    return run
+
+
+# --- BuddyAgent -------------------------------------------------------------
+
+def _extract_bench(size: int):
+    def setup():
+        agent = make_stub_agent()
+        messages = generate_messages(size, seed=5)
+
+        def run():
+            agent.extract_action_items(messages)
+        return run
+    return setup
+
+
+for _size in (1000, 10000):
+    benchmark(f"agent.extract_action_items[batch={_size}]", ops=_size)(_extract_bench(_size))
+
+
+@benchmark("agent.answer_question[stub,context=100]", ops=100)
+def _answer_question():
+    agent = make_stub_agent()
+    messages = generate_messages(100, seed=6)
+    query = QueryRequest(question="What's the status of the auth service?", timestamp=datetime.now())
+
+    def run():
+        for _ in range(100):
+            agent.answer_question(query, messages)
+    return run
+
+
+# --- Runner -----------------------------------------------------------------
+
+def run_benchmark(name: str, repeat: int) -> Dict:
+    """Run one benchmark ``repeat`` times; report per-op timings in microseconds"""
+    setup, ops = BENCHMARKS[name]
+    timings = []
+    for _ in range(repeat):
+        run = setup()
+        start = time.perf_counter()
+        run()
+        timings.append((time.perf_counter() - start) / ops * 1e6)
+    return {
+        "ops": ops,
+        "repeat": repeat,
+        "best_us": round(min(timings), 3),
+        "median_us": round(statistics.median(timings), 3),
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Print a comparison table; return names of regressed benchmarks"""
+    regressions = []
+    print(f"\n{'benchmark':48} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"{name:48} {'-':>12} {current['best_us']:>10.2f}us {'new':>8}")
+            continue
+        change = current["best_us"] / base["best_us"] - 1 if base["best_us"] else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:48} {base['best_us']:>10.2f}us {current['best_us']:>10.2f}us {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline microbenchmarks for Telegram Buddy AI")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="repeats per benchmark (best is reported)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline JSON path")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    parser.add_argument("--output", help="also write results JSON to this path")
+    parser.add_argument("--threshold", type=float, default=0.20, help="relative slowdown reported as regression")
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any benchmark regressed")
+    args = parser.parse_args(argv)
+
+    names = [name for name in BENCHMARKS if args.filter in name]
+    if not names:
+        print(f"No benchmarks match '{args.filter}'")
+        return 1
+
+    results = {}
+    for name in names:
+        results[name] = run_benchmark(name, args.repeat)
+        print(f"{name:48} best {results[name]['best_us']:>10.2f}us  median {results[name]['median_us']:>10.2f}us")
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+    if args.output:
+        _write_json(args.output, report)
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nComparing against {args.baseline} ({baseline.get('created', 'unknown date')})")
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+    elif not args.save:
+        print(f"\nNo baseline at {args.baseline}; run with --save to create one")
+
+    if args.save:
+        _write_json(args.baseline, report)
+        print(f"\nBaseline saved to {args.baseline}")
+
+    if regressions and args.fail_on_regression:
+        return 1
+    return 0
+
+
+def _write_json(path: str, data: Dict):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -62,12 +62,30 @@ async function askQuestion() {
     }
 }
 
+// Last response per panel, so refreshes can send If-None-Match and fetch
+// only messages newer than the ones already shown
+const actionsState = { projectId: null, etag: null };
+const contextState = { projectId: null, etag: null, latestSeq: 0, messages: [], info: null };
+
 async function loadActions() {
     const projectId = document.getElementById('projectInput').value || 'default';
     
+    if (actionsState.projectId !== projectId) {
+        actionsState.projectId = projectId;
+        actionsState.etag = null;
+    }
+    
     try {
-        const response = await fetch(`/api/actions/${projectId}`);
-        const actions = await response.json();
+        const headers = actionsState.etag ? { 'If-None-Match': actionsState.etag } : {};
+        const response = await fetch(`/api/actions/${encodeURIComponent(projectId)}`, { headers, cache: 'no-store' });
+        
+        if (response.status === 304) {
+            return;  // Unchanged since last load
+        }
+        actionsState.etag = response.headers.get('ETag');
+        subscribeEvents(projectId);
+        const page = await response.json();
+        const actions = page.action_items;
         
         const output = document.getElementById('actionsOutput');
         
@@ -90,29 +108,110 @@ async function loadActions() {
 async function loadContext() {
     const projectId = document.getElementById('projectInput').value || 'default';
     
+    if (contextState.projectId !== projectId) {
+        Object.assign(contextState, { projectId, etag: null, latestSeq: 0, messages: [], info: null });
+    }
+    
     try {
-        const response = await fetch(`/api/context/${projectId}`);
-        const context = await response.json();
-        
-        const output = document.getElementById('contextOutput');
+        // First load gets the latest page; later loads only what is new
+        const query = contextState.info ? `since=${contextState.latestSeq}` : 'limit=5';
+        const headers = contextState.etag ? { 'If-None-Match': contextState.etag } : {};
+        const response = await fetch(`/api/context/${encodeURIComponent(projectId)}?${query}`, { headers, cache: 'no-store' });
         
-        if (context.messages.length === 0) {
-            output.innerHTML = 'No messages in context yet.';
-        } else {
-            output.innerHTML = `
-                <strong>Project: ${context.project_id}</strong><br>
-                <strong>Messages: ${context.messages.length}</strong><br>
-                <strong>Last Updated: ${new Date(context.last_updated).toLocaleString()}</strong><br><br>
-                <strong>Recent Messages:</strong><br>
-                ${context.messages.slice(-5).map(msg => `
-                    <div class="message">
-                        <small>${new Date(msg.timestamp).toLocaleString()}</small><br>
-                        ${msg.content}
-                    </div>
-                `).join('')}
-            `;
+        if (response.status !== 304) {
+            contextState.etag = response.headers.get('ETag');
+            const page = await response.json();
+            if (page.has_more) {
+                // Too far behind: start over from the latest page
+                Object.assign(contextState, { etag: null, latestSeq: 0, messages: [], info: null });
+                return loadContext();
+            }
+            contextState.info = page;
+            contextState.latestSeq = page.latest_seq;
+            contextState.messages = contextState.messages.concat(page.messages).slice(-5);
         }
+        
+        renderContext();
+        subscribeEvents(projectId);
     } catch (error) {
         document.getElementById('contextOutput').innerHTML = 'Error: ' + error.message;
     }
 }
+
+function renderContext() {
+    const context = contextState.info;
+    const output = document.getElementById('contextOutput');
+    
+    if (context.total_messages === 0) {
+        output.innerHTML = 'No messages in context yet.';
+    } else {
+        output.innerHTML = `
+            <strong>Project: ${context.project_id}</strong><br>
+            <strong>Messages: ${context.total_messages}</strong><br>
+            <strong>Last Updated: ${new Date(context.last_updated).toLocaleString()}</strong><br><br>
+            <strong>Recent Messages:</strong><br>
+            ${contextState.messages.map(msg => `
+                <div class="message">
+                    <small>${new Date(msg.timestamp).toLocaleString()}${msg.repeat_count > 1 ? ` · posted ${msg.repeat_count}×` : ''}</small><br>
+                    ${msg.content}
+                </div>
+            `).join('')}
+        `;
+    }
+}
+
+// Live updates over Server-Sent Events, one stream for the current project
+let eventSource = null;
+let eventProjectId = null;
+
+function subscribeEvents(projectId) {
+    if (eventSource && eventProjectId === projectId) {
+        return;
+    }
+    if (eventSource) {
+        eventSource.close();
+    }
+    eventProjectId = projectId;
+    eventSource = new EventSource(`/api/events/${encodeURIComponent(projectId)}`);
+    
+    eventSource.addEventListener('message_added', event => {
+        const data = JSON.parse(event.data);
+        if (!contextState.info || contextState.projectId !== projectId) {
+            return;
+        }
+        if (data.seq !== contextState.latestSeq + 1) {
+            loadContext();  // Missed something, catch up via ?since=
+            return;
+        }
+        contextState.latestSeq = data.seq;
+        contextState.messages = contextState.messages.concat([data.message]).slice(-5);
+        contextState.info.total_messages = Math.min(contextState.info.total_messages + 1, 100);
+        contextState.info.last_updated = new Date().toISOString();
+        renderContext();
+    });
+    
+    eventSource.addEventListener('message_repeated', event => {
+        const data = JSON.parse(event.data);
+        const shown = contextState.messages.find(msg => msg.message_id === data.message_id);
+        if (shown) {
+            shown.repeat_count = data.repeat_count;
+            renderContext();
+        }
+    });
+    
+    eventSource.addEventListener('messages_imported', () => {
+        if (contextState.info) loadContext();
+    });
+    
+    const refreshActions = () => {
+        if (actionsState.projectId === projectId) loadActions();
+    };
+    eventSource.addEventListener('action_detected', refreshActions);
+    eventSource.addEventListener('action_resolved', refreshActions);
+    
+    // Also fires after reconnecting (e.g. dropped as a slow consumer): resync
+    eventSource.addEventListener('open', () => {
+        if (contextState.info) loadContext();
+        refreshActions();
+    });
+}
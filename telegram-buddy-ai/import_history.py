@@ -0,0 +1,83 @@
+# import_history.py
+"""
+Bulk-import chat history into a running Telegram Buddy AI web service.
+
+Streams a Telegram Desktop export (result.json) or an NDJSON file to
+POST /api/import without loading it into memory. This fills the web
+service's context only; the Telegram bot imports files listed in
+TELEGRAM_IMPORT_HISTORY when it starts. With --dry-run the file is
+parsed locally instead, which is handy for checking an export and measuring
+import throughput.
+
+Examples:
+    python import_history.py ~/Downloads/ChatExport/result.json
+    python import_history.py messages.ndjson --project-id backend --url http://server:8000
+    python import_history.py result.json --dry-run
+"""
+
+import argparse
+import json
+import os
+import sys
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def upload(path: str, url: str, fmt: str, project_id: str = None) -> dict:
+    """Stream the file to the import endpoint"""
+    query = {"format": fmt}
+    if project_id:
+        query["project_id"] = project_id
+    endpoint = f"{url.rstrip('/')}/api/import?{urllib.parse.urlencode(query)}"
+
+    with open(path, "rb") as f:
+        request = urllib.request.Request(
+            endpoint,
+            data=f,  # http.client sends file objects in blocks
+            method="POST",
+            headers={
+                "Content-Type": "application/x-ndjson" if fmt == "ndjson" else "application/json",
+                "Content-Length": str(os.path.getsize(path)),
+            },
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.load(response)
+
+
+def main():
+    from app.services.history_import import FORMATS, guess_format
+
+    parser = argparse.ArgumentParser(description="Import chat history into Telegram Buddy AI")
+    parser.add_argument("path", help="Telegram Desktop result.json or NDJSON file")
+    parser.add_argument("--format", choices=FORMATS, help="input format (default: from file extension)")
+    parser.add_argument("--project-id", help="import everything into this project/channel")
+    parser.add_argument("--url", default=f"http://localhost:{os.getenv('PORT', 8000)}", help="web service URL")
+    parser.add_argument("--dry-run", action="store_true", help="parse locally, don't upload")
+    args = parser.parse_args()
+
+    fmt = args.format or guess_format(args.path)
+
+    try:
+        if args.dry_run:
+            from app.services.context_manager import ContextManager
+            from app.services.history_import import import_file
+            result = import_file(ContextManager(), args.path, fmt, args.project_id)
+        else:
+            result = upload(args.path, args.url, fmt, args.project_id)
+    except urllib.error.HTTPError as e:
+        print(f"Import failed ({e.code}): {e.read().decode(errors='replace')}")
+        sys.exit(1)
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}")
+        sys.exit(1)
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
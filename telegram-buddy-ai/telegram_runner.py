@@ -15,11 +15,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 # Load environment variables
 load_dotenv()
 
-# Set up logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
-)
+# Set up logging (queue-based, see app/logging_config.py)
+from app.logging_config import configure_logging
+configure_logging()
 
 logger = logging.getLogger(__name__)
 